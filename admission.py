@@ -0,0 +1,95 @@
+import math
+import threading
+import time
+
+
+class AdmissionRejected(Exception):
+    """대기열이 가득 찼거나 대기 시간이 지나 요청을 받지 않음
+
+    status는 응답 코드(대기열이 가득 차면 429, 기다리다 시간이 지나면 503)이고
+    retry_after는 다시 시도하기까지 기다릴 초이다.
+    """
+
+    def __init__(self, message, status, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """동시에 처리할 작업 수와 기다리는 요청 수를 제한하는 입장 제어
+
+    max_active개까지 바로 처리하고, 그 뒤로는 max_queue개까지만 최대 max_wait초 동안
+    기다리게 한다. 대기열이 가득 차면 기다리지 않고 바로 거절하므로 몰리는 요청이
+    스레드와 CPU를 무한정 차지하지 않는다.
+    """
+
+    def __init__(self, max_active, max_queue=64, max_wait=5.0):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self.available = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        # 처리 시간의 지수 이동 평균 (Retry-After 계산용)
+        self.service_seconds = 0.0
+        self.stats = {'admitted': 0, 'rejected_full': 0, 'rejected_timeout': 0,
+                      'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0}
+
+    def retry_after(self):
+        """대기 중인 요청이 모두 처리될 때까지 걸릴 예상 시간 (초, 최소 1)"""
+        backlog = (self.waiting + 1) * self.service_seconds / max(self.max_active, 1)
+        return max(1, math.ceil(backlog))
+
+    def acquire(self):
+        """처리 슬롯을 얻을 때까지 기다리고 기다린 시간(초) 반환 (받을 수 없으면 AdmissionRejected)"""
+        start = time.monotonic()
+        with self.available:
+            if self.active >= self.max_active:
+                if self.waiting >= self.max_queue:
+                    self.stats['rejected_full'] += 1
+                    raise AdmissionRejected("Too many pending requests", 429, self.retry_after())
+
+                self.waiting += 1
+                try:
+                    deadline = start + self.max_wait
+                    while self.active >= self.max_active:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.stats['rejected_timeout'] += 1
+                            raise AdmissionRejected("Timed out waiting for a free worker", 503,
+                                                    self.retry_after())
+                        self.available.wait(remaining)
+                finally:
+                    self.waiting -= 1
+
+            self.active += 1
+            waited = time.monotonic() - start
+            self.stats['admitted'] += 1
+            self.stats['wait_seconds_total'] += waited
+            self.stats['wait_seconds_max'] = max(self.stats['wait_seconds_max'], waited)
+        return waited
+
+    def release(self, held_seconds=None):
+        """슬롯 반환 (held_seconds는 처리에 걸린 시간, Retry-After 추정에 사용)"""
+        with self.available:
+            self.active -= 1
+            if held_seconds is not None:
+                self.service_seconds = held_seconds if not self.service_seconds else \
+                    0.8 * self.service_seconds + 0.2 * held_seconds
+            self.available.notify()
+
+    def snapshot(self):
+        """처리 중/대기 중 요청 수와 입장 통계 반환"""
+        with self.available:
+            admitted = self.stats['admitted']
+            return dict(
+                self.stats,
+                active=self.active,
+                waiting=self.waiting,
+                max_active=self.max_active,
+                max_queue=self.max_queue,
+                wait_seconds_avg=self.stats['wait_seconds_total'] / admitted if admitted else 0.0,
+                service_seconds_avg=self.service_seconds,
+            )
@@ -0,0 +1,175 @@
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+from chessudoku import (ChessSudokuBoard, DEFAULT_PIECES, DIFFICULTY_LEVELS, GENERATOR_VERSION,
+                        count_solutions, create_puzzle, generate_puzzle, solve_sudoku)
+
+# 벤치마크에 사용하는 기물 배치 목록
+PIECE_CATALOGUE = {
+    'default': DEFAULT_PIECES,
+    'knight_heavy': [
+        ('knight', 1, 1), ('knight', 1, 7), ('knight', 4, 4),
+        ('knight', 7, 1), ('knight', 7, 7), ('knight', 4, 0)
+    ],
+    'multi_bishop': [
+        ('bishop', 0, 0), ('bishop', 0, 8), ('bishop', 4, 4),
+        ('bishop', 8, 0), ('bishop', 8, 8)
+    ],
+    'king_cluster': [
+        ('king', 3, 3), ('king', 3, 5), ('king', 5, 3), ('king', 5, 5)
+    ],
+}
+
+CASES = ['is_valid_number', 'solve_sudoku', 'count_solutions', 'create_puzzle', 'generate_puzzle']
+
+
+def make_board(pieces):
+    """기물만 배치된 빈 보드 생성"""
+    board = ChessSudokuBoard()
+    for piece_type, row, col in pieces:
+        board.place_piece(piece_type, row, col)
+    return board
+
+
+def solved_board(pieces, seed):
+    """seed로 고정된 완성 보드 생성"""
+    board = make_board(pieces)
+    if not solve_sudoku(board, rng=random.Random(seed)):
+        raise ValueError("Piece configuration has no solution")
+    return board
+
+
+def percentile(ordered, q):
+    """정렬된 목록의 q 분위수 (가장 가까운 순위)"""
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize(samples):
+    """측정값(초) 목록의 요약 통계"""
+    ordered = sorted(samples)
+    return {
+        'runs': len(ordered),
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'mean': statistics.fmean(ordered),
+        'p95': percentile(ordered, 0.95),
+        'max': ordered[-1],
+    }
+
+
+def bench_is_valid_number(pieces, seed, repeat):
+    """퍼즐의 모든 칸 x 숫자에 대해 is_valid_number를 호출한 평균 시간 (호출 1회당)"""
+    solution = solved_board(pieces, seed)
+    puzzle, _ = create_puzzle(solution, 'medium', rng=random.Random(seed))
+    calls = [(i, j, num) for i in range(9) for j in range(9) for num in range(1, 10)]
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i, j, num in calls:
+            puzzle.is_valid_number(i, j, num)
+        samples.append((time.perf_counter() - start) / len(calls))
+    return samples
+
+
+def bench_solve_sudoku(pieces, seed, repeat):
+    samples = []
+    for run in range(repeat):
+        board = make_board(pieces)
+        rng = random.Random(seed + run)
+        start = time.perf_counter()
+        solve_sudoku(board, rng=rng)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_count_solutions(pieces, seed, repeat, difficulty):
+    samples = []
+    for run in range(repeat):
+        solution = solved_board(pieces, seed + run)
+        puzzle, _ = create_puzzle(solution, difficulty, rng=random.Random(seed + run))
+        start = time.perf_counter()
+        count_solutions(puzzle, max_count=2)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_create_puzzle(pieces, seed, repeat, difficulty):
+    samples = []
+    for run in range(repeat):
+        solution = solved_board(pieces, seed + run)
+        rng = random.Random(seed + run)
+        start = time.perf_counter()
+        create_puzzle(solution, difficulty, rng=rng)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_generate_puzzle(pieces, seed, repeat, difficulty):
+    samples = []
+    for run in range(repeat):
+        start = time.perf_counter()
+        generate_puzzle(difficulty=difficulty, piece_config=pieces, seed=seed + run)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_benchmarks(cases=CASES, catalogue=PIECE_CATALOGUE, repeat=5, seed=0):
+    """선택한 측정 항목을 기물 배치(와 난이도)별로 실행하고 결과 목록 반환"""
+    results = []
+    for name, pieces in catalogue.items():
+        for case in cases:
+            if case in ('is_valid_number', 'solve_sudoku'):
+                runs = [(None, globals()[f'bench_{case}'](pieces, seed, repeat))]
+            else:
+                runs = [(difficulty, globals()[f'bench_{case}'](pieces, seed, repeat, difficulty))
+                        for difficulty in DIFFICULTY_LEVELS]
+
+            for difficulty, samples in runs:
+                entry = {'case': case, 'pieces': name, 'difficulty': difficulty}
+                entry.update(summarize(samples))
+                results.append(entry)
+                print(f"{case:<16} {name:<13} {difficulty or '-':<7} "
+                      f"median {entry['median'] * 1000:9.3f} ms", file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="체스 스도쿠 풀이/생성 벤치마크 (결과는 JSON)")
+    parser.add_argument('--repeat', type=int, default=5, help="항목별 반복 횟수")
+    parser.add_argument('--seed', type=int, default=0, help="난수 seed (반복마다 1씩 증가)")
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=CASES)
+    parser.add_argument('--pieces', nargs='+', choices=list(PIECE_CATALOGUE),
+                        default=list(PIECE_CATALOGUE))
+    parser.add_argument('--output', help="결과를 저장할 파일 (없으면 표준 출력)")
+    args = parser.parse_args(argv)
+
+    catalogue = {name: PIECE_CATALOGUE[name] for name in args.pieces}
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'seed': args.seed,
+            'generator_version': GENERATOR_VERSION,
+            'repeat': args.repeat,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'results': run_benchmarks(args.cases, catalogue, args.repeat, args.seed),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
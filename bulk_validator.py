@@ -0,0 +1,82 @@
+# numpy가 필요하다 (pip install numpy). 다른 모듈은 이 모듈을 import하지 않으므로 서버에는 필요 없다.
+import numpy as np
+
+from chessudoku import validate_piece_config
+
+# 영역 인덱스 배열에서 9칸이 안 되는 영역을 채우는 자리 (항상 0인 보조 칸)
+PAD_CELL = 81
+
+
+class RegionLayout:
+    """기물 배치 하나에 대한 검사용 영역 인덱스 배열
+
+    names[k]는 영역 k의 이름('row 3', 'knight (0, 2)', 'bishop (3, 3) main' 등)이고
+    cells[k]는 그 영역의 칸 번호 9개(모자라면 PAD_CELL)이다. 기물 칸은 어느 영역에도 넣지 않는다.
+    """
+
+    def __init__(self, piece_config=None):
+        board = validate_piece_config(piece_config)
+        fillable = [code <= 9 for code in board.grid]
+
+        regions = []
+        for i in range(9):
+            regions.append((f'row {i}', [i * 9 + j for j in range(9)]))
+        for j in range(9):
+            regions.append((f'column {j}', [i * 9 + j for i in range(9)]))
+        for box in range(9):
+            top, left = box // 3 * 3, box % 3 * 3
+            regions.append((f'box {box}', [(top + i) * 9 + left + j
+                                           for i in range(3) for j in range(3)]))
+
+        # get_knight_moves / get_bishop_diagonals / get_king_moves로 만든 기물 영역
+        for key, cells in board.get_piece_regions():
+            name = f'{key[0]} ({key[1][0]}, {key[1][1]})'
+            if len(key) > 2:
+                name += f' {key[2]}'
+            regions.append((name, [r * 9 + c for r, c in cells]))
+
+        self.names = [name for name, _ in regions]
+        self.cells = np.full((len(regions), 9), PAD_CELL, dtype=np.intp)
+        for k, (_, cells) in enumerate(regions):
+            cells = [idx for idx in cells if fillable[idx]]
+            self.cells[k, :len(cells)] = cells
+        self.fillable = np.flatnonzero(fillable)
+
+
+def verify_solutions(grids, piece_config=None, layout=None):
+    """(N, 9, 9) 정답 배열을 한 번에 검사하여 (유효 여부 배열, 첫 위반 목록) 반환
+
+    기물이 없는 칸은 모두 1~9여야 하고(위반 시 'cell (행, 열)'), 행/열/박스와 나이트,
+    비숍 대각선, 킹 영역에 같은 숫자가 없어야 한다. 기물 칸의 값은 검사하지 않는다.
+    첫 위반은 칸 검사, 행, 열, 박스, 기물 영역 순서로 처음 어긋난 항목의 이름이며
+    유효한 보드는 None이다. 같은 배치를 반복해 검사할 때는 RegionLayout을 넘기면 된다.
+    """
+    if layout is None:
+        layout = RegionLayout(piece_config)
+
+    grids = np.asarray(grids)
+    if grids.ndim != 3 or grids.shape[1:] != (9, 9):
+        raise ValueError(f"Expected an (N, 9, 9) array, got shape {grids.shape}")
+    count = grids.shape[0]
+
+    # 보조 칸(항상 0)을 덧붙인 (N, 82) 배열
+    flat = np.zeros((count, 82), dtype=np.int8)
+    flat[:, :81] = np.clip(grids.reshape(count, 81), -1, 10)
+
+    # 칸 검사: 기물이 없는 칸은 1~9
+    values = flat[:, layout.fillable]
+    bad_cells = (values < 1) | (values > 9)
+
+    # 영역 검사: 정렬 후 이웃한 같은 숫자(0 제외)가 있으면 중복
+    regions = np.sort(flat[:, layout.cells], axis=2)
+    repeated = (regions[:, :, 1:] == regions[:, :, :-1]) & (regions[:, :, 1:] > 0)
+    bad_regions = repeated.any(axis=2)
+
+    violations = np.concatenate([bad_cells, bad_regions], axis=1)
+    valid = ~violations.any(axis=1)
+    first = violations.argmax(axis=1)
+
+    cell_names = [f'cell ({idx // 9}, {idx % 9})' for idx in layout.fillable]
+    names = cell_names + layout.names
+    first_violation = [None if ok else names[k] for ok, k in zip(valid.tolist(), first.tolist())]
+    return valid, first_violation
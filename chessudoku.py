@@ -1,18 +1,142 @@
+import hashlib
 import random
-import copy
 import json
+import time
+from array import array
+from functools import lru_cache
+
+# 압축 형식에서 사용하는 기물 종류 순서와 문자
+PIECE_TYPES = ['king', 'bishop', 'knight', 'rook']
+PIECE_CODES_ORDER = 'KBNR'
+PIECE_CODES = dict(zip(PIECE_TYPES, PIECE_CODES_ORDER))
+PACKED_VERSION = 1
+
+
+# 보드 칸 코드: 0은 빈 칸, 1~9는 숫자, PIECE_BASE부터는 PIECE_TYPES 순서의 기물, MARK_CODE는 'N' 표시
+PIECE_BASE = 10
+MARK_CODE = PIECE_BASE + len(PIECE_TYPES)
+PIECE_SYMBOLS = {
+    'king': '♚',
+    'bishop': '♝',
+    'knight': '♞',
+    'rook': '♜'
+}
+CELL_VALUES = (None,) + tuple(range(1, 10)) + \
+    tuple(PIECE_SYMBOLS[piece] for piece in PIECE_TYPES) + ('N',)
+CELL_CODES = {value: code for code, value in enumerate(CELL_VALUES)}
+
+# 칸 코드 변환표: 기물만 남기기 (copy_layout), 숫자 문자로 바꾸기 (to_compact)
+LAYOUT_TABLE = bytes(code if PIECE_BASE <= code < MARK_CODE else 0 for code in range(256))
+COMPACT_TABLE = bytes(48 + code if code <= 9 else 48 for code in range(256))
+
+
+def _move_table(offsets):
+    """칸 번호 → 주어진 방향으로 한 번 이동한 칸 번호들 (보드 밖은 제외)"""
+    table = []
+    for row in range(9):
+        for col in range(9):
+            table.append(tuple((row + dr) * 9 + col + dc for dr, dc in offsets
+                               if 0 <= row + dr < 9 and 0 <= col + dc < 9))
+    return tuple(table)
+
+
+class BoardRow:
+    """board[i][j] 형태의 접근을 위한 한 행의 보기 (평면 grid의 값을 읽고 씀)
+
+    리스트처럼 음수 인덱스와 슬라이스로 읽고 쓸 수 있다 (슬라이스로 읽으면 리스트를 반환하고,
+    행 길이는 9로 고정이므로 슬라이스에 넣는 값의 개수가 다르면 ValueError).
+    """
+
+    __slots__ = ('grid', 'start')
+
+    def __init__(self, grid, start):
+        self.grid = grid
+        self.start = start
+
+    def __getitem__(self, col):
+        if isinstance(col, slice):
+            return [CELL_VALUES[self.grid[self.start + j]] for j in range(9)[col]]
+        return CELL_VALUES[self.grid[self.start + range(9)[col]]]
+
+    def __setitem__(self, col, value):
+        if isinstance(col, slice):
+            cols = range(9)[col]
+            values = list(value)
+            if len(values) != len(cols):
+                raise ValueError(f"Cannot resize a board row (expected {len(cols)} values)")
+            for j, item in zip(cols, values):
+                self[j] = item
+            return
+        if value not in CELL_CODES:
+            raise ValueError(f"Unsupported cell value: {value!r}")
+        self.grid[self.start + range(9)[col]] = CELL_CODES[value]
+
+    def __iter__(self):
+        return (CELL_VALUES[code] for code in self.grid[self.start:self.start + 9])
+
+    def __len__(self):
+        return 9
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class BoardView:
+    """평면 grid를 9x9 리스트처럼 보여주는 보기 (board.board[i][j] 호환용)
+
+    슬라이스로 읽으면 행 보기의 리스트를, board[i] = 행 값으로 쓰면 그 행의 칸 값을 바꾼다.
+    """
+
+    __slots__ = ('grid',)
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [BoardRow(self.grid, i * 9) for i in range(9)[row]]
+        return BoardRow(self.grid, range(9)[row] * 9)
+
+    def __setitem__(self, row, values):
+        self[row][:] = values
+
+    def __iter__(self):
+        return (BoardRow(self.grid, start) for start in range(0, 81, 9))
+
+    def __len__(self):
+        return 9
+
+    def __eq__(self, other):
+        return [list(row) for row in self] == [list(row) for row in other]
+
+    def __repr__(self):
+        return repr([list(row) for row in self])
+
 
 class ChessSudokuBoard:
+    """체스 스도쿠 보드
+
+    칸 값은 81바이트 grid 하나에 코드로 저장하고(board[i][j]로도 읽고 쓸 수 있음),
+    기물 영역(나이트, 비숍 대각선, 킹 주변)마다 놓인 숫자는 9비트 마스크로 추적한다.
+    기물 기호와 이동 표는 모든 보드가 공유하며, clone()은 grid와 마스크만 복사한다.
+    """
+
+    __slots__ = ('grid', 'piece_positions', 'region_keys', 'region_masks', 'region_index')
+
+    # 모든 보드가 공유하는 기물 기호와 이동 표 (칸 번호 → 이동 가능한 칸 번호들)
+    pieces = PIECE_SYMBOLS
+    KING_MOVES = _move_table([(-1, -1), (-1, 0), (-1, 1), (0, -1),
+                              (0, 1), (1, -1), (1, 0), (1, 1)])
+    KNIGHT_MOVES = _move_table([(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                                (1, -2), (1, 2), (2, -1), (2, 1)])
+    EMPTY_INDEX = ((),) * 81
+
     def __init__(self):
-        # 9x9 보드 초기화
-        self.board = [[None for _ in range(9)] for _ in range(9)]
-
-        self.pieces = {
-            'king': '♚',
-            'bishop': '♝',
-            'knight': '♞',
-            'rook': '♜'
-        }
+        # 9x9 보드 (칸 번호 row * 9 + col)
+        self.grid = bytearray(81)
 
         # 각 기물의 위치 저장
         self.piece_positions = {
@@ -22,35 +146,94 @@ class ChessSudokuBoard:
             'rook': []
         }
 
-        # 나이트의 이동 위치에 있는 숫자들을 추적하기 위한 딕셔너리
-        self.knight_move_numbers = {}
-        # 비숍의 대각선 위치에 있는 숫자들을 추적하기 위한 딕셔너리
-        self.bishop_diagonals = {}
-        # 킹 주변의 숫자들을 추적하기 위한 딕셔너리
-        self.king_adjacent_numbers = {}
+        # 기물 영역 키 ('knight', 위치) / ('bishop', 위치, 방향) / ('king', 위치)와
+        # 영역마다 놓인 숫자의 비트마스크, 칸 번호 → 그 칸을 포함하는 영역 번호들
+        self.region_keys = ()
+        self.region_masks = array('H')
+        self.region_index = self.EMPTY_INDEX
+
+    @property
+    def board(self):
+        """board[i][j]로 칸 값(None, 숫자, 기물 기호)을 읽고 쓰는 보기"""
+        return BoardView(self.grid)
+
+    @board.setter
+    def board(self, rows):
+        """9x9 칸 값으로 grid 전체를 바꿈 (board[i][j]에 쓸 때처럼 기물 위치와 추적 데이터는 그대로)"""
+        rows = list(rows)
+        if len(rows) != 9:
+            raise ValueError("A board needs 9 rows")
+        view = BoardView(self.grid)
+        for i, row in enumerate(rows):
+            view[i] = row
+
+    def clone(self):
+        """보드 복사 (영역 키와 색인은 바뀌지 않는 튜플이므로 공유)"""
+        board = ChessSudokuBoard.__new__(ChessSudokuBoard)
+        board.grid = bytearray(self.grid)
+        board.piece_positions = {piece: list(positions)
+                                 for piece, positions in self.piece_positions.items()}
+        board.region_keys = self.region_keys
+        board.region_masks = array('H', self.region_masks)
+        board.region_index = self.region_index
+        return board
+
+    def __copy__(self):
+        return self.clone()
+
+    def __deepcopy__(self, memo):
+        return self.clone()
+
+    def _region_numbers(self, kind):
+        """영역 종류별 {위치: 숫자 집합} (비숍은 {위치: {'main', 'anti'}})"""
+        result = {}
+        for key, mask in zip(self.region_keys, self.region_masks):
+            if key[0] != kind:
+                continue
+            numbers = {d for d in range(1, 10) if mask >> (d - 1) & 1}
+            if kind == 'bishop':
+                result.setdefault(key[1], {})[key[2]] = numbers
+            else:
+                result[key[1]] = numbers
+        return result
+
+    @property
+    def knight_move_numbers(self):
+        """나이트의 이동 위치에 있는 숫자들 (추적 마스크에서 만든 사본)"""
+        return self._region_numbers('knight')
+
+    @property
+    def bishop_diagonals(self):
+        """비숍의 대각선 위치에 있는 숫자들 (추적 마스크에서 만든 사본)"""
+        return self._region_numbers('bishop')
+
+    @property
+    def king_adjacent_numbers(self):
+        """킹 주변의 숫자들 (추적 마스크에서 만든 사본)"""
+        return self._region_numbers('king')
 
     def to_dict(self):
         """보드 상태를 딕셔너리로 변환"""
         return {
             'board': [
-                [cell if isinstance(cell, (int, type(None))) else str(cell) 
+                [cell if isinstance(cell, (int, type(None))) else str(cell)
                  for cell in row]
                 for row in self.board
             ],
             'piece_positions': self.piece_positions,
             'knight_move_numbers': {
-                f"{pos[0]},{pos[1]}": list(numbers) 
+                f"{pos[0]},{pos[1]}": sorted(numbers)
                 for pos, numbers in self.knight_move_numbers.items()
             },
             'bishop_diagonals': {
                 f"{pos[0]},{pos[1]}": {
-                    'main': list(diags['main']),
-                    'anti': list(diags['anti'])
+                    'main': sorted(diags['main']),
+                    'anti': sorted(diags['anti'])
                 }
                 for pos, diags in self.bishop_diagonals.items()
             },
             'king_adjacent_numbers': {
-                f"{pos[0]},{pos[1]}": list(numbers)
+                f"{pos[0]},{pos[1]}": sorted(numbers)
                 for pos, numbers in self.king_adjacent_numbers.items()
             }
         }
@@ -59,7 +242,7 @@ class ChessSudokuBoard:
     def from_dict(cls, data):
         """딕셔너리에서 보드 상태 복원"""
         board = cls()
-        
+
         # 보드 상태 복원
         for i in range(9):
             for j in range(9):
@@ -71,23 +254,108 @@ class ChessSudokuBoard:
                     board.board[i][j] = cell if cell != 'None' else None
 
         # 숫자 추적 데이터 복원
+        tracked = []
         for pos_str, numbers in data['knight_move_numbers'].items():
             i, j = map(int, pos_str.split(','))
-            board.knight_move_numbers[(i, j)] = set(numbers)
+            tracked.append((('knight', (i, j)), numbers))
 
         for pos_str, diags in data['bishop_diagonals'].items():
             i, j = map(int, pos_str.split(','))
-            board.bishop_diagonals[(i, j)] = {
-                'main': set(diags['main']),
-                'anti': set(diags['anti'])
-            }
+            tracked.append((('bishop', (i, j), 'main'), diags['main']))
+            tracked.append((('bishop', (i, j), 'anti'), diags['anti']))
 
         for pos_str, numbers in data['king_adjacent_numbers'].items():
             i, j = map(int, pos_str.split(','))
-            board.king_adjacent_numbers[(i, j)] = set(numbers)
+            tracked.append((('king', (i, j)), numbers))
+
+        region_ids = {key: region_id for region_id, key in enumerate(board.region_keys)}
+        for key, numbers in tracked:
+            if key in region_ids:
+                mask = 0
+                for num in numbers:
+                    mask |= 1 << (num - 1)
+                board.region_masks[region_ids[key]] = mask
+        return board
+
+    def to_compact(self):
+        """보드를 81자 숫자 문자열(빈 칸과 기물 칸은 0)과 기물 목록 문자열로 변환
+
+        기물 목록은 기물마다 '종류 문자 + 행 + 열' 3글자 (예: 'N02N47K75B33')이며,
+        추적 데이터는 보드 내용에서 다시 계산할 수 있으므로 포함하지 않는다.
+        """
+        grid = self.grid.translate(COMPACT_TABLE).decode('ascii')
+        pieces = ''.join(f"{PIECE_CODES[piece]}{row}{col}"
+                         for piece, positions in self.piece_positions.items()
+                         for row, col in positions)
+        return {'grid': grid, 'pieces': pieces}
+
+    @classmethod
+    def from_compact(cls, data):
+        """to_compact 결과에서 보드를 복원하고 추적 데이터를 다시 계산"""
+        grid = data['grid']
+        pieces = data['pieces']
+        if len(grid) != 81 or len(pieces) % 3:
+            raise ValueError("Invalid compact board")
+
+        board = cls()
+        for k in range(0, len(pieces), 3):
+            board._place_decoded_piece(PIECE_CODES_ORDER.find(pieces[k]),
+                                       int(pieces[k + 1]), int(pieces[k + 2]))
+        board._place_digits(int(ch) for ch in grid)
+        return board
+
+    def to_packed(self):
+        """보드를 바이트열로 압축
+
+        버전(1바이트) + 칸당 4비트 숫자(41바이트) + 기물 수(1바이트) + 기물마다 종류와 칸 번호(2바이트)
+        """
+        digits = [code if code <= 9 else 0 for code in self.grid]
+        digits.append(0)
+        packed = bytearray([PACKED_VERSION])
+        packed += bytes((digits[i] << 4) | digits[i + 1] for i in range(0, 82, 2))
+
+        pieces = [(PIECE_TYPES.index(piece), row * 9 + col)
+                  for piece, positions in self.piece_positions.items()
+                  for row, col in positions]
+        packed.append(len(pieces))
+        for piece_code, idx in pieces:
+            packed += bytes((piece_code, idx))
+        return bytes(packed)
 
+    @classmethod
+    def from_packed(cls, packed):
+        """to_packed 결과에서 보드를 복원하고 추적 데이터를 다시 계산"""
+        if len(packed) < 43 or packed[0] != PACKED_VERSION or len(packed) != 43 + 2 * packed[42]:
+            raise ValueError("Invalid packed board")
+
+        board = cls()
+        for k in range(43, len(packed), 2):
+            row, col = divmod(packed[k + 1], 9)
+            board._place_decoded_piece(packed[k], row, col)
+
+        digits = []
+        for byte in packed[1:42]:
+            digits.append(byte >> 4)
+            digits.append(byte & 0x0F)
+        board._place_digits(digits[:81])
         return board
 
+    def _place_decoded_piece(self, piece_index, row, col):
+        """압축 형식에서 읽은 기물 배치 (알 수 없는 종류, 보드 밖이나 이미 기물이 있는 칸이면 ValueError)"""
+        if not 0 <= piece_index < len(PIECE_TYPES):
+            raise ValueError(f"Unknown piece code at ({row}, {col})")
+        if not (0 <= row < 9 and 0 <= col < 9) or self.grid[row * 9 + col]:
+            raise ValueError(f"Invalid piece position ({row}, {col})")
+        self.place_piece(PIECE_TYPES[piece_index], row, col)
+
+    def _place_digits(self, digits):
+        """칸 순서대로 주어진 숫자(0은 빈 칸)를 규칙 검사와 함께 배치"""
+        for idx, num in enumerate(digits):
+            if num:
+                row, col = divmod(idx, 9)
+                if not self.place_number(row, col, num):
+                    raise ValueError(f"Invalid number {num} at ({row}, {col})")
+
     def to_json(self):
         """보드 상태를 JSON 문자열로 변환"""
         return json.dumps(self.to_dict())
@@ -99,12 +367,7 @@ class ChessSudokuBoard:
 
     def get_king_moves(self, row, col):
         """킹의 이동 가능한 위치(주변 8방향) 반환"""
-        moves = [
-            (row-1, col-1), (row-1, col), (row-1, col+1),
-            (row, col-1),                 (row, col+1),
-            (row+1, col-1), (row+1, col), (row+1, col+1)
-        ]
-        return [(r, c) for r, c in moves if 0 <= r < 9 and 0 <= c < 9]
+        return [divmod(idx, 9) for idx in self.KING_MOVES[row * 9 + col]]
 
     def get_bishop_diagonals(self, row, col):
         """비숍의 대각선 이동 가능한 위치들을 반환"""
@@ -112,133 +375,109 @@ class ChessSudokuBoard:
             'main': [],    # 왼쪽 위에서 오른쪽 아래 방향
             'anti': []     # 오른쪽 위에서 왼쪽 아래 방향
         }
-        
-        # 메인 대각선 (↘️)
-        r, c = row - 1, col - 1
-        while r >= 0 and c >= 0:
-            if not isinstance(self.board[r][c], str):  # 체스 기물이 없는 경우만
-                diagonals['main'].append((r, c))
-            else:
-                break  # 체스 기물을 만나면 그 방향으로의 탐색 중단
-            r, c = r - 1, c - 1
-
-        r, c = row + 1, col + 1
-        while r < 9 and c < 9:
-            if not isinstance(self.board[r][c], str):
-                diagonals['main'].append((r, c))
-            else:
-                break
-            r, c = r + 1, c + 1
-
-        # 반대 대각선 (↙️)
-        r, c = row - 1, col + 1
-        while r >= 0 and c < 9:
-            if not isinstance(self.board[r][c], str):
-                diagonals['anti'].append((r, c))
-            else:
-                break
-            r, c = r - 1, c + 1
+        grid = self.grid
 
-        r, c = row + 1, col - 1
-        while r < 9 and c >= 0:
-            if not isinstance(self.board[r][c], str):
-                diagonals['anti'].append((r, c))
-            else:
-                break
-            r, c = r + 1, c - 1
+        # 방향마다 체스 기물(표시 포함)을 만나면 그 방향으로의 탐색 중단
+        for direction, dr, dc in (('main', -1, -1), ('main', 1, 1),
+                                  ('anti', -1, 1), ('anti', 1, -1)):
+            r, c = row + dr, col + dc
+            while 0 <= r < 9 and 0 <= c < 9 and grid[r * 9 + c] < PIECE_BASE:
+                diagonals[direction].append((r, c))
+                r, c = r + dr, c + dc
 
         return diagonals
 
     def get_knight_moves(self, row, col):
         """나이트의 이동 가능한 위치 반환"""
-        moves = [
-            (row-2, col-1), (row-2, col+1),
-            (row-1, col-2), (row-1, col+2),
-            (row+1, col-2), (row+1, col+2),
-            (row+2, col-1), (row+2, col+1)
-        ]
-        return [(r, c) for r, c in moves if 0 <= r < 9 and 0 <= c < 9]
+        return [divmod(idx, 9) for idx in self.KNIGHT_MOVES[row * 9 + col]]
 
     def mark_piece_moves(self, piece, row, col):
         """체스 기물이 이동 가능한 위치에 표시"""
-        moves = []
         if piece == 'knight':
-            moves = self.get_knight_moves(row, col)
-            mark = 'N'            
-        for r, c in moves:
-            if self.board[r][c] is None:  # 빈 칸일 경우에만 표시
-                self.board[r][c] = mark
+            for idx in self.KNIGHT_MOVES[row * 9 + col]:
+                if self.grid[idx] == 0:  # 빈 칸일 경우에만 표시
+                    self.grid[idx] = MARK_CODE
+        # 표시도 비숍의 대각선을 막으므로 영역 색인 재구성
+        self.build_region_index()
+
+    def get_piece_regions(self):
+        """기물 영역(나이트, 비숍 대각선, 킹 주변)마다 (영역 키, 영역 칸 목록) 반환"""
+        regions = []
+
+        for knight_pos in self.piece_positions['knight']:
+            regions.append((('knight', knight_pos), self.get_knight_moves(*knight_pos)))
+
+        # 비숍의 대각선은 다른 기물에 막히므로 기물이 바뀔 때마다 다시 계산해야 함
+        for bishop_pos in self.piece_positions['bishop']:
+            diagonals = self.get_bishop_diagonals(*bishop_pos)
+            for direction in ('main', 'anti'):
+                regions.append((('bishop', bishop_pos, direction), diagonals[direction]))
+
+        for king_pos in self.piece_positions['king']:
+            regions.append((('king', king_pos), self.get_king_moves(*king_pos)))
+
+        return regions
+
+    def build_region_index(self):
+        """기물 영역 목록과 칸별 영역 색인을 다시 만듦 (같은 영역의 추적 마스크는 유지)"""
+        masks = dict(zip(self.region_keys, self.region_masks))
+        regions = self.get_piece_regions()
+
+        index = [[] for _ in range(81)]
+        for region_id, (_, cells) in enumerate(regions):
+            for row, col in cells:
+                index[row * 9 + col].append(region_id)
+
+        self.region_keys = tuple(key for key, _ in regions)
+        self.region_masks = array('H', [masks.get(key, 0) for key in self.region_keys])
+        self.region_index = tuple(tuple(ids) for ids in index)
 
     def place_piece(self, piece, row, col):
         """체스 기물을 보드에 배치하고 이동 가능 위치 표시"""
         if piece in self.pieces and 0 <= row < 9 and 0 <= col < 9:
-            self.board[row][col] = self.pieces[piece]
+            self.grid[row * 9 + col] = PIECE_BASE + PIECE_TYPES.index(piece)
             self.piece_positions[piece].append((row, col))
-            
-            if piece == 'knight':
-                self.knight_move_numbers[(row, col)] = set()
 
-            elif piece == 'bishop':
-                self.bishop_diagonals[(row, col)] = {
-                    'main': set(),
-                    'anti': set()
-                }
-            elif piece == 'king':
-                self.king_adjacent_numbers[(row, col)] = set()
+            # 새 기물의 영역은 빈 추적 마스크로 시작
+            for region_id, key in enumerate(self.region_keys):
+                if key[0] == piece and key[1] == (row, col):
+                    self.region_masks[region_id] = 0
+
+            self.build_region_index()
             return True
         return False
 
     def is_valid_number(self, row, col, num):
         """주어진 위치에 숫자를 놓을 수 있는지 확인"""
-        # 체스 기물이 있는 칸인지 확인
-        if isinstance(self.board[row][col], str) and self.board[row][col] in self.pieces.values():
+        grid = self.grid
+        idx = row * 9 + col
+
+        # 체스 기물이 있는 칸인지 확인 (1~9가 아닌 숫자도 놓을 수 없음)
+        if PIECE_BASE <= grid[idx] < MARK_CODE or not 1 <= num <= 9:
             return False
-            
+
         # 행 검사
-        for j in range(9):
-            if self.board[row][j] == num:
-                return False
-                
+        start = row * 9
+        if num in grid[start:start + 9]:
+            return False
+
         # 열 검사
-        for i in range(9):
-            if self.board[i][col] == num:
-                return False
-                
+        if num in grid[col::9]:
+            return False
+
         # 3x3 박스 검사
-        box_row, box_col = 3 * (row // 3), 3 * (col // 3)
-        for i in range(box_row, box_row + 3):
-            for j in range(box_col, box_col + 3):
-                if self.board[i][j] == num:
-                    return False
-        
-        # 나이트 이동 규칙 검사
-        for knight_pos in self.piece_positions['knight']:
-            knight_moves = self.get_knight_moves(*knight_pos)
-            if (row, col) in knight_moves:
-                if num in self.knight_move_numbers[knight_pos]:
-                    return False
-    
-        # 비숍 대각선 규칙 검사
-        for bishop_pos in self.piece_positions['bishop']:
-            diagonals = self.get_bishop_diagonals(*bishop_pos)
-            
-            # 메인 대각선 검사
-            if (row, col) in diagonals['main']:
-                if num in self.bishop_diagonals[bishop_pos]['main']:
-                    return False
-            
-            # 반대 대각선 검사
-            if (row, col) in diagonals['anti']:
-                if num in self.bishop_diagonals[bishop_pos]['anti']:
-                    return False
-                
-        # 킹 주변 규칙 검사
-        for king_pos in self.piece_positions['king']:
-            king_moves = self.get_king_moves(*king_pos)
-            if (row, col) in king_moves:
-                if num in self.king_adjacent_numbers[king_pos]:
-                    return False
-                
+        box = (row - row % 3) * 9 + col - col % 3
+        if num in grid[box:box + 3] or num in grid[box + 9:box + 12] or \
+                num in grid[box + 18:box + 21]:
+            return False
+
+        # 나이트, 비숍 대각선, 킹 주변 규칙 검사
+        bit = 1 << (num - 1)
+        masks = self.region_masks
+        for region_id in self.region_index[idx]:
+            if masks[region_id] & bit:
+                return False
+
         return True
 
     def get_piece_moves(self, row, col):
@@ -251,30 +490,41 @@ class ChessSudokuBoard:
     def place_number(self, row, col, num):
         """숫자를 보드에 배치"""
         if self.is_valid_number(row, col, num):
-            self.board[row][col] = num
-            
-            # 나이트의 이동 범위에 있는 경우 해당 숫자 기록
-            for knight_pos in self.piece_positions['knight']:
-                knight_moves = self.get_knight_moves(*knight_pos)
-                if (row, col) in knight_moves:
-                    self.knight_move_numbers[knight_pos].add(num)
-
-            # 비숍의 대각선 범위에 있는 경우 해당 숫자 기록
-            for bishop_pos in self.piece_positions['bishop']:
-                diagonals = self.get_bishop_diagonals(*bishop_pos)
-                if (row, col) in diagonals['main']:
-                    self.bishop_diagonals[bishop_pos]['main'].add(num)
-                if (row, col) in diagonals['anti']:
-                    self.bishop_diagonals[bishop_pos]['anti'].add(num)
-
-            # 킹의 주변 8방향에 있는 경우 해당 숫자 기록
-            for king_pos in self.piece_positions['king']:
-                king_moves = self.get_king_moves(*king_pos)
-                if (row, col) in king_moves:
-                    self.king_adjacent_numbers[king_pos].add(num)
+            idx = row * 9 + col
+            self.grid[idx] = num
+
+            # 이 칸을 포함하는 기물 영역에 해당 숫자 기록
+            bit = 1 << (num - 1)
+            masks = self.region_masks
+            for region_id in self.region_index[idx]:
+                masks[region_id] |= bit
             return True
         return False
-    
+
+    def remove_number(self, row, col):
+        """보드에서 숫자를 제거하고 기물 영역의 추적 데이터에서도 삭제"""
+        idx = row * 9 + col
+        num = self.grid[idx]
+        if not 1 <= num <= 9:
+            return False
+
+        self.grid[idx] = 0
+        keep = ALL_DIGITS ^ (1 << (num - 1))
+        masks = self.region_masks
+        for region_id in self.region_index[idx]:
+            masks[region_id] &= keep
+        return True
+
+    def copy_layout(self):
+        """숫자 없이 체스 기물 배치만 복사한 새 보드 반환"""
+        board = self.clone()
+        board.grid = self.grid.translate(LAYOUT_TABLE)
+        board.region_masks = array('H', bytes(2 * len(self.region_masks)))
+        if MARK_CODE in self.grid:
+            # 표시가 사라지면 비숍 대각선이 달라지므로 영역 재계산
+            board.build_region_index()
+        return board
+
     def print_board(self):
         """보드 출력"""
 
@@ -304,6 +554,653 @@ class ChessSudokuBoard:
         # 하단 테두리
         print("└───────────────────────┘")
 
+# 난이도별 제거할 셀의 개수 (체스 기물 제외)
+DIFFICULTY_LEVELS = {
+    'easy': (35, 40),    # 41-46개의 힌트
+    'medium': (45, 50),  # 31-36개의 힌트
+    'hard': (55, 60)     # 21-26개의 힌트
+}
+
+def normalize_difficulty(difficulty):
+    """알 수 없는 난이도는 create_puzzle과 같이 'medium'으로 취급"""
+    return difficulty if difficulty in DIFFICULTY_LEVELS else 'medium'
+
+# 기본 체스 기물 배치 설정
+DEFAULT_PIECES = [
+    ('knight', 0, 2),
+    ('knight', 4, 7),
+    ('king', 7, 5),
+    ('bishop', 3, 3)
+]
+
+class SearchStats:
+    """탐색/생성 계측 값 (풀이 엔진과 create_puzzle에 넘기면 채워짐)
+
+    nodes는 탐색 함수 호출 수, backtracks는 시도한 숫자를 되돌린 횟수, restarts는
+    generate_puzzle이 풀이를 처음부터 다시 시작한 횟수이다.
+    phase_seconds에는 generate_puzzle의 단계(solve, carve)별 소요 시간이 쌓인다.
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.backtracks = 0
+        self.removals_accepted = 0
+        self.removals_rejected = 0
+        self.restarts = 0
+        self.phase_seconds = {}
+
+    def add_phase(self, name, seconds):
+        self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + seconds
+
+    def to_dict(self):
+        return {
+            'nodes': self.nodes,
+            'backtracks': self.backtracks,
+            'removals_accepted': self.removals_accepted,
+            'removals_rejected': self.removals_rejected,
+            'restarts': self.restarts,
+            'phase_seconds': dict(self.phase_seconds),
+        }
+
+
+class GenerationTimeout(TimeoutError):
+    """퍼즐 생성이 제한 시간이나 탐색 노드 한도 안에 끝나지 않음"""
+
+
+class InvalidPieceConfig(ValueError):
+    """기물 배치가 잘못되었거나 숫자를 채울 수 없음"""
+
+
+class SearchBudgetExceeded(Exception):
+    """탐색이 SearchBudget의 한도에 도달함 (탐색을 중단하기 위해 사용)"""
+
+
+class SearchBudget:
+    """탐색 노드 수와 마감 시각(time.monotonic 기준)의 한도
+
+    풀이 엔진이 노드마다 tick()을 호출하며, 한도를 넘으면 SearchBudgetExceeded가 발생한다.
+    restart()로 전체 한도 안에서 이번 시도에만 쓸 노드 수를 따로 정할 수 있다.
+    마감 시각은 check_interval 노드마다 확인한다.
+    """
+
+    check_interval = 256
+
+    def __init__(self, max_nodes=None, deadline=None):
+        self.max_nodes = max_nodes
+        self.deadline = deadline
+        self.nodes = 0
+        self.stop_at = max_nodes
+
+    def restart(self, nodes=None):
+        """지금부터 nodes개까지만 탐색하도록 설정 (None이면 전체 한도까지)"""
+        self.stop_at = self.max_nodes
+        if nodes is not None:
+            limit = self.nodes + nodes
+            self.stop_at = limit if self.stop_at is None else min(self.stop_at, limit)
+
+    def tick(self):
+        self.nodes += 1
+        if self.stop_at is not None and self.nodes > self.stop_at:
+            raise SearchBudgetExceeded()
+        if self.deadline is not None and self.nodes % self.check_interval == 0 \
+                and time.monotonic() > self.deadline:
+            raise SearchBudgetExceeded()
+
+    def exhausted(self):
+        """전체 노드 한도나 마감 시각을 넘겼는지 확인"""
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            return True
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+
+# 숫자 d는 비트 (d - 1)로 표현, 1~9 전체는 9비트
+ALL_DIGITS = (1 << 9) - 1
+DIGIT_BITS = [(d, 1 << (d - 1)) for d in range(1, 10)]
+# 후보 마스크 → 후보 개수
+POPCOUNT = [bin(mask).count('1') for mask in range(ALL_DIGITS + 1)]
+
+
+class BitmaskSolver:
+    """행, 열, 박스, 기물 영역마다 사용된 숫자를 9비트 마스크로 관리하는 풀이 상태
+
+    칸은 0~80의 정수(row * 9 + col)로 다루며, 기물이 있는 칸은 어느 영역에도
+    속하지 않는다. 빈 칸마다 후보 마스크를 유지하여, 숫자를 놓을 때 같은 영역을 공유하는
+    칸(peer)의 후보만 갱신하고 변경 내역은 trail에 남겨 undo로 되돌린다.
+    탐색은 항상 후보가 가장 적은 칸(MRV)에서 분기한다.
+    stats(SearchStats)를 넘기면 탐색 노드와 되돌림 횟수를 세고, budget(SearchBudget)을
+    넘기면 한도를 넘는 즉시 SearchBudgetExceeded로 탐색을 중단한다.
+    """
+
+    def __init__(self, board, stats=None, budget=None):
+        self.board = board
+        self.stats = stats
+        self.budget = budget
+        self.grid = [0] * 81
+        self.fillable = [False] * 81
+        self.consistent = True
+
+        codes = board.grid
+        for idx in range(81):
+            if codes[idx] <= 9:
+                self.fillable[idx] = True
+        self.open_cells = [idx for idx in range(81) if self.fillable[idx]]
+
+        # 행, 열, 3x3 박스 영역
+        regions = []
+        for i in range(9):
+            regions.append([i * 9 + j for j in range(9)])
+        for j in range(9):
+            regions.append([i * 9 + j for i in range(9)])
+        for box_row in range(0, 9, 3):
+            for box_col in range(0, 9, 3):
+                regions.append([(box_row + i) * 9 + box_col + j
+                                for i in range(3) for j in range(3)])
+
+        # 나이트, 비숍 대각선, 킹 주변 영역
+        for _, cells in board.get_piece_regions():
+            regions.append([r * 9 + c for r, c in cells])
+
+        self.regions = [[idx for idx in cells if self.fillable[idx]]
+                        for cells in regions]
+        self.masks = [0] * len(self.regions)
+
+        cell_regions = [[] for _ in range(81)]
+        peers = [set() for _ in range(81)]
+        for region_id, cells in enumerate(self.regions):
+            for idx in cells:
+                cell_regions[idx].append(region_id)
+                peers[idx].update(cells)
+        self.cell_regions = [tuple(ids) for ids in cell_regions]
+        self.peers = [tuple(sorted(p - {idx})) for idx, p in enumerate(peers)]
+
+        # 빈 칸별 후보 마스크와 되돌리기용 trail (후보에서 지워진 peer 칸 목록)
+        self.cand = [ALL_DIGITS if fillable else 0 for fillable in self.fillable]
+        self.trail = []
+        # 제약 전파로 채운 (칸, 배치 직전 trail 길이) 스택
+        self.placed = []
+
+        # 이미 채워진 숫자 반영 (충돌이 있으면 풀 수 없는 상태로 표시)
+        for idx in range(81):
+            num = codes[idx]
+            if 1 <= num <= 9:
+                if not self.candidates(idx) & (1 << (num - 1)):
+                    self.consistent = False
+                if not self.place(idx, num):
+                    self.consistent = False
+        self.trail = []
+
+    def candidates(self, idx):
+        """칸에 놓을 수 있는 숫자들의 비트마스크를 영역 마스크에서 계산"""
+        used = 0
+        masks = self.masks
+        for region_id in self.cell_regions[idx]:
+            used |= masks[region_id]
+        return ~used & ALL_DIGITS
+
+    def place(self, idx, num):
+        """칸에 숫자를 배치하고 peer 칸의 후보에서 제거
+
+        후보가 하나도 남지 않은 빈 칸이 생기면 False 반환 (배치는 그대로 유지됨)
+        """
+        bit = 1 << (num - 1)
+        grid = self.grid
+        grid[idx] = num
+        masks = self.masks
+        for region_id in self.cell_regions[idx]:
+            masks[region_id] |= bit
+
+        cand = self.cand
+        trail = self.trail
+        alive = True
+        for peer in self.peers[idx]:
+            if not grid[peer] and cand[peer] & bit:
+                cand[peer] ^= bit
+                trail.append(peer)
+                if not cand[peer]:
+                    alive = False
+        return alive
+
+    def undo(self, idx, marker):
+        """place를 되돌림 (marker는 place 직전의 trail 길이)"""
+        bit = 1 << (self.grid[idx] - 1)
+        self.grid[idx] = 0
+        masks = self.masks
+        for region_id in self.cell_regions[idx]:
+            masks[region_id] &= ~bit
+
+        cand = self.cand
+        trail = self.trail
+        while len(trail) > marker:
+            cand[trail.pop()] |= bit
+
+    def remove(self, idx):
+        """임의 칸의 숫자를 지우고 주변 칸의 후보를 영역 마스크에서 다시 계산"""
+        bit = ~(1 << (self.grid[idx] - 1))
+        grid = self.grid
+        grid[idx] = 0
+        masks = self.masks
+        for region_id in self.cell_regions[idx]:
+            masks[region_id] &= bit
+
+        cand = self.cand
+        cand[idx] = self.candidates(idx)
+        for peer in self.peers[idx]:
+            if not grid[peer]:
+                cand[peer] = self.candidates(peer)
+
+    def fill(self, idx, num):
+        """탐색 밖에서 숫자를 확정 배치 (undo용 trail 기록은 남기지 않음)"""
+        marker = len(self.trail)
+        alive = self.place(idx, num)
+        del self.trail[marker:]
+        return alive
+
+    def select_cell(self):
+        """후보가 가장 적은 빈 칸 반환 (빈 칸이 없으면 -1)"""
+        best = -1
+        best_count = 10
+        grid = self.grid
+        cand = self.cand
+        for idx in self.open_cells:
+            if not grid[idx]:
+                count = POPCOUNT[cand[idx]]
+                if count < best_count:
+                    best, best_count = idx, count
+                    if count <= 1:
+                        break
+        return best
+
+    def empty_cells(self):
+        """아직 채워지지 않은 칸 목록 (행 우선 순서)"""
+        return [idx for idx in self.open_cells if not self.grid[idx]]
+
+    def rollback(self, mark):
+        """placed 스택이 mark 길이가 될 때까지 배치를 역순으로 되돌림"""
+        placed = self.placed
+        while len(placed) > mark:
+            idx, marker = placed.pop()
+            self.undo(idx, marker)
+
+    def propagate(self):
+        """naked single과 hidden single을 더 이상 없을 때까지 채움 (모순이 생기면 False)
+
+        채운 칸은 placed 스택에 쌓이므로 호출한 쪽에서 rollback으로 되돌린다.
+        칸이 k개인 영역은 서로 다른 숫자 k개를 담아야 하므로, 그 영역에 놓일 수 있는 숫자가
+        정확히 k개이면 모두 반드시 들어가야 한다. hidden single은 이때에만 적용되며,
+        그래서 9칸 미만인 나이트, 비숍 대각선, 킹 영역과 기물이 있는 행/열/박스에도 쓰인다.
+        """
+        grid = self.grid
+        cand = self.cand
+        masks = self.masks
+        trail = self.trail
+        placed = self.placed
+
+        changed = True
+        while changed:
+            changed = False
+
+            # naked single: 후보가 하나뿐인 칸
+            for idx in self.open_cells:
+                if not grid[idx]:
+                    mask = cand[idx]
+                    if not mask:
+                        return False
+                    if not mask & (mask - 1):
+                        placed.append((idx, len(trail)))
+                        if not self.place(idx, mask.bit_length()):
+                            return False
+                        changed = True
+
+            # hidden single: 반드시 들어가야 하는 숫자가 놓일 칸이 하나뿐인 경우
+            for region_id, cells in enumerate(self.regions):
+                once = twice = 0
+                for idx in cells:
+                    if not grid[idx]:
+                        mask = cand[idx]
+                        twice |= once & mask
+                        once |= mask
+                used = masks[region_id]
+                available = POPCOUNT[once | used]
+                if available < len(cells):
+                    return False
+                singles = once & ~twice & ~used
+                if available > len(cells) or not singles:
+                    continue
+
+                for idx in cells:
+                    if not grid[idx] and cand[idx] & singles:
+                        bit = cand[idx] & singles
+                        if bit & (bit - 1):
+                            return False
+                        placed.append((idx, len(trail)))
+                        if not self.place(idx, bit.bit_length()):
+                            return False
+                        changed = True
+        return True
+
+    def solve(self, shuffle=True, fail_fast=True, propagate=True, rng=random):
+        """백트래킹으로 빈 칸을 모두 채움 (성공 여부 반환)
+
+        fail_fast가 참이면 후보가 없는 빈 칸이 생기는 즉시 그 분기를 포기하고,
+        propagate가 참이면 분기할 때마다 먼저 single들을 채운다. shuffle이 참이면 후보 숫자를
+        rng(random.Random 또는 random 모듈)로 섞는다.
+        """
+        if not self.consistent:
+            return False
+        cand = self.cand
+        trail = self.trail
+        placed = self.placed
+        stats = self.stats
+        budget = self.budget
+
+        def search():
+            if stats is not None:
+                stats.nodes += 1
+            if budget is not None:
+                budget.tick()
+            mark = len(placed)
+            if propagate and not self.propagate():
+                self.rollback(mark)
+                return False
+
+            idx = self.select_cell()
+            if idx < 0:
+                return True
+
+            numbers = [d for d, bit in DIGIT_BITS if cand[idx] & bit]
+            if shuffle:
+                rng.shuffle(numbers)
+
+            for num in numbers:
+                marker = len(trail)
+                if self.place(idx, num) or not fail_fast:
+                    if search():
+                        return True
+                self.undo(idx, marker)
+                if stats is not None:
+                    stats.backtracks += 1
+            self.rollback(mark)
+            return False
+
+        return search()
+
+    def count(self, max_count=1, fail_fast=True, propagate=True):
+        """해답 개수를 max_count까지만 셈 (탐색 후 상태는 원래대로 복구됨)"""
+        if not self.consistent:
+            return 0
+        cand = self.cand
+        trail = self.trail
+        placed = self.placed
+        stats = self.stats
+        budget = self.budget
+        solutions = [0]
+
+        def search():
+            if stats is not None:
+                stats.nodes += 1
+            if budget is not None:
+                budget.tick()
+            mark = len(placed)
+            if not propagate or self.propagate():
+                idx = self.select_cell()
+                if idx < 0:
+                    solutions[0] += 1
+                else:
+                    for num, bit in DIGIT_BITS:
+                        if cand[idx] & bit:
+                            marker = len(trail)
+                            if self.place(idx, num) or not fail_fast:
+                                search()
+                            self.undo(idx, marker)
+                            if stats is not None:
+                                stats.backtracks += 1
+                            if solutions[0] >= max_count:
+                                break
+            self.rollback(mark)
+
+        search()
+        return solutions[0]
+
+    def has_solution_without(self, idx, num, propagate=True):
+        """빈 칸 idx에 num이 아닌 숫자가 들어가는 해가 있는지 확인 (상태는 그대로 복구됨)"""
+        saved = self.cand[idx]
+        self.cand[idx] = saved & ~(1 << (num - 1))
+        try:
+            return bool(self.cand[idx]) and self.count(max_count=1, propagate=propagate) > 0
+        finally:
+            self.cand[idx] = saved
+
+    def has_other_solution(self, known, propagate=True):
+        """known(칸 번호 → 숫자)과 다른 해가 있는지 확인 (상태는 그대로 복구됨)
+
+        각 칸에서 known의 숫자를 먼저 시도하므로 known 자체는 되돌아감 없이 한 번에
+        지나가고, 나머지 탐색은 known과 다른 해를 찾는 데에만 쓰인다.
+        """
+        if not self.consistent:
+            return False
+        grid = self.grid
+        cand = self.cand
+        trail = self.trail
+        placed = self.placed
+        stats = self.stats
+        budget = self.budget
+
+        def search(differs):
+            if stats is not None:
+                stats.nodes += 1
+            if budget is not None:
+                budget.tick()
+            mark = len(placed)
+            found = False
+            if not propagate or self.propagate():
+                for idx, _ in placed[mark:]:
+                    if grid[idx] != known[idx]:
+                        differs = True
+
+                idx = self.select_cell()
+                if idx < 0:
+                    found = differs
+                else:
+                    expected = known[idx]
+                    expected_bit = 1 << (expected - 1)
+                    if cand[idx] & expected_bit:
+                        marker = len(trail)
+                        found = self.place(idx, expected) and search(differs)
+                        self.undo(idx, marker)
+                        if stats is not None and not found:
+                            stats.backtracks += 1
+
+                    for num, bit in DIGIT_BITS:
+                        if found:
+                            break
+                        if cand[idx] & bit and bit != expected_bit:
+                            marker = len(trail)
+                            found = self.place(idx, num) and search(True)
+                            self.undo(idx, marker)
+                            if stats is not None and not found:
+                                stats.backtracks += 1
+            self.rollback(mark)
+            return found
+
+        return search(False)
+
+    def apply_to(self, board):
+        """풀이 결과를 보드와 기물 영역 추적 마스크에 반영"""
+        cells = board.grid
+        masks = board.region_masks
+        for idx in range(81):
+            num = self.grid[idx]
+            if num and cells[idx] == 0:
+                cells[idx] = num
+                bit = 1 << (num - 1)
+                for region_id in board.region_index[idx]:
+                    masks[region_id] |= bit
+
+
+class ExactCoverSolver(BitmaskSolver):
+    """보드를 exact cover 문제로 바꿔 Algorithm X(Dancing Links 방식)로 푸는 백엔드
+
+    행(후보)은 (빈 칸, 숫자) 쌍이고 열(제약)은 다음과 같다.
+    - 빈 칸마다 정확히 하나의 숫자 (필수 열)
+    - 영역마다 각 숫자는 최대 한 번 (선택 열). 단, 기물 없이 9칸이 모두 비어 있지 않은
+      행/열/박스처럼 칸이 9개인 영역은 모든 숫자가 정확히 한 번 들어가야 하므로 필수 열로 둔다.
+    기물이 있는 행/열/박스나 나이트, 비숍 대각선, 킹 영역은 9칸 미만이라 선택 열이 된다.
+    링크 리스트 대신 열 → 행 집합 딕셔너리로 cover/uncover를 수행한다.
+    """
+
+    def build_matrix(self):
+        """현재 상태에서 exact cover 행렬 (열 → 행 집합, 행 → 열 목록, 필수 열) 생성"""
+        columns = {}
+        rows = {}
+        primary = []
+
+        empty = self.empty_cells()
+        for idx in empty:
+            columns[idx] = set()
+            primary.append(idx)
+
+        for region_id, cells in enumerate(self.regions):
+            used = self.masks[region_id]
+            for num, bit in DIGIT_BITS:
+                if not used & bit:
+                    col = 81 + region_id * 9 + num - 1
+                    columns[col] = set()
+                    if len(cells) == 9:
+                        primary.append(col)
+
+        for idx in empty:
+            for num, bit in DIGIT_BITS:
+                if self.cand[idx] & bit:
+                    row = idx * 9 + num - 1
+                    cols = [idx] + [81 + region_id * 9 + num - 1
+                                    for region_id in self.cell_regions[idx]]
+                    rows[row] = cols
+                    for col in cols:
+                        columns[col].add(row)
+
+        return columns, rows, primary
+
+    @staticmethod
+    def cover(columns, rows, row):
+        """행을 선택하고 그 행과 충돌하는 행들을 행렬에서 제거"""
+        removed = []
+        for col in rows[row]:
+            for other in columns[col]:
+                for other_col in rows[other]:
+                    if other_col != col:
+                        columns[other_col].discard(other)
+            removed.append(columns.pop(col))
+        return removed
+
+    @staticmethod
+    def uncover(columns, rows, row, removed):
+        """cover를 역순으로 되돌림"""
+        for col in reversed(rows[row]):
+            columns[col] = removed.pop()
+            for other in columns[col]:
+                for other_col in rows[other]:
+                    if other_col != col:
+                        columns[other_col].add(other)
+
+    @staticmethod
+    def choose_column(columns, primary):
+        """남은 필수 열 중 행이 가장 적은 열 반환 (없으면 None)"""
+        best = None
+        best_size = None
+        for col in primary:
+            if col in columns:
+                size = len(columns[col])
+                if best is None or size < best_size:
+                    best, best_size = col, size
+                    if size <= 1:
+                        break
+        return best
+
+    def solve(self, shuffle=True, fail_fast=True, propagate=True, rng=random):
+        """Algorithm X로 빈 칸을 모두 채움 (fail_fast, propagate는 열 선택에 이미 포함되므로 무시됨)"""
+        if not self.consistent:
+            return False
+        columns, rows, primary = self.build_matrix()
+        chosen = []
+        stats = self.stats
+        budget = self.budget
+
+        def search():
+            if stats is not None:
+                stats.nodes += 1
+            if budget is not None:
+                budget.tick()
+            col = self.choose_column(columns, primary)
+            if col is None:
+                return True
+
+            candidates = list(columns[col])
+            if shuffle:
+                rng.shuffle(candidates)
+            for row in candidates:
+                chosen.append(row)
+                removed = self.cover(columns, rows, row)
+                if search():
+                    return True
+                self.uncover(columns, rows, row, removed)
+                chosen.pop()
+                if stats is not None:
+                    stats.backtracks += 1
+            return False
+
+        if not search():
+            return False
+        for row in chosen:
+            idx, digit = divmod(row, 9)
+            self.place(idx, digit + 1)
+        return True
+
+    def count(self, max_count=1, fail_fast=True, propagate=True):
+        """Algorithm X로 해답 개수를 max_count까지만 셈"""
+        if not self.consistent:
+            return 0
+        columns, rows, primary = self.build_matrix()
+        solutions = [0]
+        stats = self.stats
+        budget = self.budget
+
+        def search():
+            if stats is not None:
+                stats.nodes += 1
+            if budget is not None:
+                budget.tick()
+            col = self.choose_column(columns, primary)
+            if col is None:
+                solutions[0] += 1
+                return
+
+            for row in sorted(columns[col]):
+                removed = self.cover(columns, rows, row)
+                search()
+                self.uncover(columns, rows, row, removed)
+                if stats is not None:
+                    stats.backtracks += 1
+                if solutions[0] >= max_count:
+                    return
+
+        search()
+        return solutions[0]
+
+
+# solve_sudoku / count_solutions에서 선택 가능한 풀이 엔진
+SOLVER_BACKENDS = {
+    'bitmask': BitmaskSolver,
+    'dlx': ExactCoverSolver,
+}
+
+
+def make_solver(board, backend='bitmask', stats=None, budget=None):
+    """이름으로 풀이 엔진을 골라 보드의 풀이 상태 생성"""
+    if backend not in SOLVER_BACKENDS:
+        raise ValueError(f"Unknown solver backend: {backend}")
+    return SOLVER_BACKENDS[backend](board, stats, budget)
+
+
 def find_empty_cell(board):
     """비어있는 셀(None)을 찾아 반환"""
     for i in range(9):
@@ -313,187 +1210,288 @@ def find_empty_cell(board):
                     return i, j
     return None
 
-def solve_sudoku(board):
-    """백트래킹을 사용하여 스도쿠 해결"""
-    import random
-    
-    empty = find_empty_cell(board)
-    
-    # 모든 셀이 채워졌다면 완료
-    if empty is None:
-        return True
-        
-    row, col = empty
-    
-    # 1-9를 랜덤하게 섞어서 시도
-    numbers = list(range(1, 10))
-    random.shuffle(numbers)
-    
-    for num in numbers:
-        # 현재 숫자가 유효한지 확인
-        if board.is_valid_number(row, col, num):
-            # 숫자 배치
-            board.place_number(row, col, num)
-            
-            # 재귀적으로 나머지 셀 해결 시도
-            if solve_sudoku(board):
-                return True
-                
-            # 해결책을 찾지 못했다면 백트래킹
-            board.board[row][col] = None
-
-            # 나이트의 이동 범위에서 숫자 제거
-            for knight_pos in board.piece_positions['knight']:
-                knight_moves = board.get_knight_moves(*knight_pos)
-                if (row, col) in knight_moves:
-                    board.knight_move_numbers[knight_pos].discard(num)
-
-            # 비숍의 대각선에서 숫자 제거
-            for bishop_pos in board.piece_positions['bishop']:
-                diagonals = board.get_bishop_diagonals(*bishop_pos)
-                if (row, col) in diagonals['main']:
-                    board.bishop_diagonals[bishop_pos]['main'].discard(num)
-                if (row, col) in diagonals['anti']:
-                    board.bishop_diagonals[bishop_pos]['anti'].discard(num)
-    
-            # 킹의 주변에서 숫자 제거
-            for king_pos in board.piece_positions['king']:
-                king_moves = board.get_king_moves(*king_pos)
-                if (row, col) in king_moves:
-                    board.king_adjacent_numbers[king_pos].discard(num)
-    return False
-
-def create_puzzle(board, difficulty='medium'):
-    """완성된 스도쿠에서 숫자를 제거하여 퍼즐 생성"""
-    import random
-    import copy
-    
-    # 난이도별 제거할 셀의 개수 (체스 기물 제외)
-    difficulty_levels = {
-        'easy': (35, 40),    # 41-46개의 힌트
-        'medium': (45, 50),  # 31-36개의 힌트
-        'hard': (55, 60)     # 21-26개의 힌트
-    }
-    
-    if difficulty not in difficulty_levels:
-        difficulty = 'medium'
+def solve_sudoku(board, fail_fast=True, backend='bitmask', propagate=True, stats=None,
+                 budget=None, rng=random):
+    """스도쿠 해결 (기본은 제약 전파 + 후보가 가장 적은 칸부터 채우는 비트마스크 백트래킹)
+
+    budget의 한도를 넘으면 보드를 바꾸지 않고 SearchBudgetExceeded를 그대로 전달한다.
+    후보 숫자는 rng로 섞으므로 같은 seed의 random.Random을 넘기면 같은 해가 나온다.
+    """
+    solver = make_solver(board, backend, stats, budget)
+    if not solver.solve(fail_fast=fail_fast, propagate=propagate, rng=rng):
+        return False
+
+    solver.apply_to(board)
+    return True
+
+def create_puzzle(board, difficulty='medium', backend='bitmask', stats=None, budget=None,
+                  rng=random):
+    """완성된 스도쿠에서 숫자를 제거하여 퍼즐 생성
+
+    보드를 복사하지 않고 하나의 풀이 상태에서 숫자를 지웠다가, 해가 유일하지 않으면
+    다시 채운다. 유일해 검사 탐색은 trail로 상태를 되돌리므로 시도마다 추가 할당이 없다.
+    제거할 칸 수와 순서는 rng로 정한다.
+    """
+    difficulty = normalize_difficulty(difficulty)
         
-    min_remove, max_remove = difficulty_levels[difficulty]
-    cells_to_remove = random.randint(min_remove, max_remove)
+    min_remove, max_remove = DIFFICULTY_LEVELS[difficulty]
+    cells_to_remove = rng.randint(min_remove, max_remove)
     
     # 제거 가능한 셀의 위치 수집 (체스 기물이 없는 위치만)
-    available_cells = []
-    for i in range(9):
-        for j in range(9):
-            if isinstance(board.board[i][j], int):
-                available_cells.append((i, j))
+    available_cells = [divmod(idx, 9) for idx in range(81) if 1 <= board.grid[idx] <= 9]
                 
-    # 퍼즐 생성을 위한 보드 복사
-    puzzle_board = copy.deepcopy(board)
+    solver = make_solver(board, backend, stats, budget)
     removed_cells = []
     
     while cells_to_remove > 0 and available_cells:
         # 랜덤하게 셀 선택
-        cell_idx = random.randrange(len(available_cells))
+        cell_idx = rng.randrange(len(available_cells))
         row, col = available_cells.pop(cell_idx)
+        idx = row * 9 + col
         
-        # 현재 값 저장
-        temp_value = puzzle_board.board[row][col]
-        # 셀 비우기
-        puzzle_board.board[row][col] = None
-        
-        # 유일해 체크
-        temp_board = copy.deepcopy(puzzle_board)
-        solution_count = count_solutions(temp_board, max_count=2)
+        # 현재 값 저장 후 셀 비우기
+        temp_value = solver.grid[idx]
+        solver.remove(idx)
         
-        if solution_count == 1:
+        # 유일해 체크: 지우기 전 퍼즐의 해는 정답 하나뿐이므로,
+        # 이 칸에 원래 숫자가 아닌 다른 숫자가 들어가는 해가 없으면 여전히 유일하다
+        if not solver.has_solution_without(idx, temp_value):
             # 제거 성공
             removed_cells.append((row, col, temp_value))
             cells_to_remove -= 1
+            if stats is not None:
+                stats.removals_accepted += 1
         else:
             # 제거 실패 - 값 복구
-            puzzle_board.board[row][col] = temp_value
-            
+            solver.fill(idx, temp_value)
+            if stats is not None:
+                stats.removals_rejected += 1
+
+    # 남은 숫자로 새 보드를 만들어 추적 데이터가 실제 보드 내용과 일치하도록 함
+    puzzle_board = board.copy_layout()
+    solver.apply_to(puzzle_board)
     return puzzle_board, removed_cells
 
-def count_solutions(board, max_count=1):
+def count_solutions(board, max_count=1, fail_fast=True, backend='bitmask', propagate=True,
+                    stats=None, budget=None):
     """주어진 보드의 해답 개수를 세는 함수 (max_count까지만)"""
-    solutions = [0]
-    
-    def solve_counter(b):
-        if solutions[0] >= max_count:
-            return
-            
-        empty = find_empty_cell(b)
-        if empty is None:
-            solutions[0] += 1
-            return
-            
-        row, col = empty
-        for num in range(1, 10):
-            if b.is_valid_number(row, col, num):
-                b.place_number(row, col, num)
-                solve_counter(b)
-                b.board[row][col] = None
-
-                # 나이트의 이동 범위에서 숫자 제거
-                for knight_pos in b.piece_positions['knight']:
-                    knight_moves = b.get_knight_moves(*knight_pos)
-                    if (row, col) in knight_moves:
-                        b.knight_move_numbers[knight_pos].discard(num)
-    
-                # 비숍의 대각선에서 숫자 제거
-                for bishop_pos in b.piece_positions['bishop']:
-                    diagonals = b.get_bishop_diagonals(*bishop_pos)
-                    if (row, col) in diagonals['main']:
-                        b.bishop_diagonals[bishop_pos]['main'].discard(num)
-                    if (row, col) in diagonals['anti']:
-                        b.bishop_diagonals[bishop_pos]['anti'].discard(num)
-
-                # 킹의 주변에서 숫자 제거
-                for king_pos in b.piece_positions['king']:
-                    king_moves = b.get_king_moves(*king_pos)
-                    if (row, col) in king_moves:
-                        b.king_adjacent_numbers[king_pos].discard(num)
-    solve_counter(board)
-    return solutions[0]
-
-def generate_puzzle(*, difficulty='medium', piece_config=None):
-    """체스 스도쿠 퍼즐 생성 함수"""
-    board = ChessSudokuBoard()
-    
-    # 기본 체스 기물 배치 설정
-    default_pieces = [
-        ('knight', 0, 2),
-        ('knight', 4, 7),
-        ('king', 7, 5),
-        ('bishop', 3, 3)
-    ]
-    
-    # piece_config가 제공된 경우 사용
-    pieces_to_place = piece_config if piece_config else default_pieces
-    
-    # 체스 기물 배치
-    for piece in pieces_to_place:
-        if isinstance(piece, tuple):
-            piece_type, row, col = piece
-        else:
-            piece_type = piece['type']
+    return make_solver(board, backend, stats, budget).count(max_count, fail_fast=fail_fast,
+                                             propagate=propagate)
+
+
+def is_logically_solvable(board):
+    """추측 없이 naked/hidden single만으로 보드를 끝까지 채울 수 있는지 확인 (보드는 그대로)"""
+    solver = BitmaskSolver(board)
+    if not solver.consistent or not solver.propagate():
+        return False
+    return solver.select_cell() < 0
+
+def is_unique(puzzle, solution):
+    """퍼즐의 해가 주어진 정답 하나뿐인지 확인 (정답과 다른 해만 탐색)"""
+    known = [0] * 81
+    for i in range(9):
+        for j in range(9):
+            cell = puzzle.board[i][j]
+            answer = solution.board[i][j]
+            if isinstance(cell, int) or cell is None:
+                if not isinstance(answer, int) or (cell is not None and cell != answer):
+                    raise ValueError("Solution does not match the puzzle")
+                known[i * 9 + j] = answer
+            elif cell != answer:
+                raise ValueError("Solution does not match the puzzle")
+
+    if not BitmaskSolver(solution).consistent:
+        raise ValueError("Solution breaks the board constraints")
+
+    return not BitmaskSolver(puzzle).has_other_solution(known)
+
+def iter_pieces(piece_config):
+    """(종류, 행, 열) 튜플이나 {'type', 'position'} 딕셔너리 목록을 (종류, 행, 열)로 순회"""
+    for piece in piece_config:
+        if isinstance(piece, dict):
             row, col = piece['position']
+            yield piece['type'], row, col
+        else:
+            piece_type, row, col = piece
+            yield piece_type, row, col
+
+
+def normalize_piece_config(piece_config):
+    """기물 배치를 순서와 표현 형식에 무관한 정렬된 튜플로 변환 (없으면 기본 배치)"""
+    pieces = piece_config if piece_config else DEFAULT_PIECES
+    return tuple(sorted((piece_type, int(row), int(col))
+                        for piece_type, row, col in iter_pieces(pieces)))
+
+
+# 생성 알고리즘 버전 (같은 seed로 다른 퍼즐이 나오도록 생성 과정을 바꾸면 올려야 함)
+GENERATOR_VERSION = 1
+
+
+def puzzle_content_id(seed, difficulty, piece_config=None, variant=None):
+    """(seed, 난이도, 정렬된 기물 배치, 생성 알고리즘 버전)의 해시로 만든 퍼즐 ID
+
+    같은 값으로 generate_puzzle을 실행하면 같은 퍼즐이 나오므로 ID만으로 퍼즐을 다시 만들거나
+    이미 저장된 퍼즐을 찾을 수 있다. variant는 숫자 치환/대칭 변환으로 만든 퍼즐의 변환 정보이다.
+    알 수 없는 난이도는 같은 퍼즐이 나오는 'medium'과 같은 ID가 되도록 정규화한다.
+    """
+    key = [GENERATOR_VERSION, seed, normalize_difficulty(difficulty),
+           normalize_piece_config(piece_config)]
+    if variant is not None:
+        key.append(variant)
+    encoded = json.dumps(key, separators=(',', ':'), sort_keys=True)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:32]
+
+
+def largest_peer_clique(solver):
+    """영역마다 그 영역의 모든 칸과 peer인 칸을 욕심껏 더해 얻은 가장 큰 clique 크기
+
+    clique 안의 칸은 모두 서로 다른 숫자여야 하므로 9보다 크면 채울 수 없는 배치이다.
+    (하한값이므로 9 이하라고 해서 풀 수 있다는 보장은 없다.)
+    """
+    peers = [set(p) for p in solver.peers]
+    largest = 0
+    for cells in solver.regions:
+        if not cells:
+            continue
+        clique = set(cells)
+        common = set.intersection(*(peers[idx] for idx in cells)) - clique
+        for idx in sorted(common, key=lambda i: -len(peers[i])):
+            if clique <= peers[idx]:
+                clique.add(idx)
+        largest = max(largest, len(clique))
+    return largest
+
+
+def validate_piece_config(piece_config):
+    """탐색 전에 기물 배치를 검사하고 기물을 배치한 빈 보드 반환
+
+    알 수 없는 기물 종류, 정수가 아니거나 보드를 벗어난 위치, 같은 칸에 놓인 기물처럼
+    잘못된 입력과, 서로 다른 숫자가 10개 이상 필요한 칸 묶음이 있어 채울 수 없는 배치는
+    InvalidPieceConfig로 거부한다. 없으면 기본 배치를 사용한다.
+    """
+    pieces = piece_config if piece_config else DEFAULT_PIECES
+    try:
+        pieces = list(iter_pieces(pieces))
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidPieceConfig(f"Malformed piece entry: {e}")
+
+    board = ChessSudokuBoard()
+    seen = set()
+    for piece_type, row, col in pieces:
+        if piece_type not in PIECE_TYPES:
+            raise InvalidPieceConfig(f"Unknown piece type: {piece_type}")
+        for value in (row, col):
+            if not isinstance(value, int) or isinstance(value, bool) or not 0 <= value < 9:
+                raise InvalidPieceConfig(f"Invalid position for {piece_type}: {[row, col]}")
+        if (row, col) in seen:
+            raise InvalidPieceConfig(f"More than one piece at {[row, col]}")
+        seen.add((row, col))
         board.place_piece(piece_type, row, col)
+
+    if largest_peer_clique(BitmaskSolver(board)) > 9:
+        raise InvalidPieceConfig("Piece configuration cannot be filled with digits 1-9")
+    return board
+
+
+@lru_cache(maxsize=1024)
+def _piece_config_error(pieces):
+    """정렬한 기물 배치 튜플을 validate_piece_config로 검사한 오류 메시지 (문제가 없으면 None)"""
+    try:
+        validate_piece_config(list(pieces))
+    except InvalidPieceConfig as e:
+        return str(e)
+    return None
+
+
+def check_piece_config(piece_config):
+    """validate_piece_config와 같이 검사하되 결과를 기물 배치별로 기억 (보드는 반환하지 않음)
+
+    요청마다 같은 배치의 clique 검사를 반복하지 않도록 정렬한 (종류, 행, 열) 튜플을 키로 최근
+    1024개 배치의 결과를 캐시한다. True나 1.0은 키에서 1과 같아지므로, 종류가 문자열이고
+    위치가 정수인 배치만 캐시하고 나머지는 캐시 없이 검사한다.
+    """
+    pieces = piece_config if piece_config else DEFAULT_PIECES
+    try:
+        pieces = list(iter_pieces(pieces))
+    except (KeyError, TypeError, ValueError):
+        pieces = None
+    if pieces is None or not all(type(piece_type) is str and type(row) is int and type(col) is int
+                                 for piece_type, row, col in pieces):
+        validate_piece_config(piece_config)
+        return
+    error = _piece_config_error(tuple(sorted(pieces)))
+    if error is not None:
+        raise InvalidPieceConfig(error)
+
+
+# 첫 풀이 시도의 탐색 노드 한도와, 다시 시작할 때마다 한도를 늘리는 배율
+RESTART_NODES = 300
+RESTART_GROWTH = 1.3
+
+
+def generate_puzzle(*, difficulty='medium', piece_config=None, instrument=False,
+                    timeout=None, max_nodes=None, seed=None):
+    """체스 스도쿠 퍼즐 생성 함수
+
+    모든 무작위 선택은 random.Random(seed) 하나로 하므로 같은 seed, 난이도, 기물 배치에서는
+    항상 같은 퍼즐이 나온다 (seed가 없으면 새로 골라 결과의 'seed'에 담는다).
+
+    instrument가 참이면 탐색 노드, 되돌림, 제거 시도 결과와 단계별 시간을
+    결과의 'stats'에 담는다 (거짓이면 계측하지 않음).
+
+    무작위 풀이는 드물게 아주 오래 걸리므로 RESTART_NODES 노드 안에 끝나지 않으면 새 무작위
+    순서로 다시 시작한다. timeout(초)이나 max_nodes(전체 탐색 노드)를 넘기면
+    GenerationTimeout, 배치가 잘못되었거나 해가 없으면 InvalidPieceConfig가 발생한다.
+    """
+    if seed is None:
+        seed = random.getrandbits(63)
+    rng = random.Random(seed)
+    stats = SearchStats() if instrument else None
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    budget = SearchBudget(max_nodes, deadline)
+
+    # 체스 기물 배치 (탐색 전에 잘못된 배치를 거부)
+    board = validate_piece_config(piece_config)
     
     # 스도쿠 해결
-    if not solve_sudoku(board):
-        raise ValueError("Failed to generate valid solution")
+    start = time.perf_counter()
+    restart_nodes = RESTART_NODES
+    while True:
+        budget.restart(restart_nodes)
+        try:
+            solved = solve_sudoku(board, stats=stats, budget=budget, rng=rng)
+            break
+        except SearchBudgetExceeded:
+            if budget.exhausted():
+                raise GenerationTimeout(f"Puzzle generation exceeded its budget "
+                                        f"({budget.nodes} nodes)")
+            restart_nodes = int(restart_nodes * RESTART_GROWTH)
+            if stats is not None:
+                stats.restarts += 1
+    if not solved:
+        raise InvalidPieceConfig("Failed to generate valid solution")
+    if stats is not None:
+        stats.add_phase('solve', time.perf_counter() - start)
         
     # 퍼즐 생성
-    puzzle, removed = create_puzzle(board, difficulty)
+    start = time.perf_counter()
+    budget.restart()
+    try:
+        puzzle, removed = create_puzzle(board, difficulty, stats=stats, budget=budget, rng=rng)
+    except SearchBudgetExceeded:
+        raise GenerationTimeout(f"Puzzle generation exceeded its budget ({budget.nodes} nodes)")
+    if stats is not None:
+        stats.add_phase('carve', time.perf_counter() - start)
     
-    return {
+    result = {
         'puzzle': puzzle,
         'solution': board,
-        'removed_cells': removed
+        'removed_cells': removed,
+        'seed': seed
     }
+    if stats is not None:
+        result['stats'] = stats.to_dict()
+    return result
 
 
 def test_puzzle_generation():
@@ -1,15 +1,348 @@
-from flask import Flask, jsonify, request
-from firebase_admin import credentials, firestore, initialize_app
+import atexit
+import base64
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from functools import partial
+from flask import Blueprint, Flask, Response, jsonify, request
 import json
-from chessudoku import ChessSudokuBoard, solve_sudoku, create_puzzle, generate_puzzle
+from chessudoku import ChessSudokuBoard, DIFFICULTY_LEVELS
+from chessudoku import (GenerationTimeout, InvalidPieceConfig, check_piece_config,
+                        normalize_difficulty, puzzle_content_id)
+from puzzle_pool import PuzzlePool
+from puzzle_transforms import layout_symmetries, random_variant
+from play_state import PlayStateCache, parse_moves
+from generation_service import GenerationService
+from metrics import MetricsRegistry
+from admission import AdmissionController, AdmissionRejected
+from puzzle_bank import BankDocumentStore, PuzzleBank
+from puzzle_store import (CachedPuzzleStore, FirestorePuzzleStore, InMemoryPuzzleStore,
+                          WriteBehindQueue, WriteQueueFull, compute_etag, firestore_client,
+                          served_document)
 
-# Flask 앱 초기화
-app = Flask(__name__)
+# 라우트는 Blueprint에 등록하고 create_app()에서 앱에 붙인다
+api = Blueprint('chessudoku', __name__)
 
-# Firebase 초기화
-cred = credentials.Certificate(r'C:\Users\rwt12\Documents\python_projects\projects\chessudoku\chessudoku-c1699-firebase-adminsdk-fbsvc-16a948f726.json')
-initialize_app(cred)
-db = firestore.client()
+# 퍼즐 저장소, 조회 캐시, 쓰기 대기열, 플레이 상태 캐시, 로컬 퍼즐 은행과 그 조회 캐시
+# (configure_storage()에서 설정)
+puzzle_store = None
+puzzle_cache = None
+write_queue = None
+play_states = None
+puzzle_bank = None
+bank_cache = None
+
+def make_default_store():
+    """환경 변수에 따라 퍼즐 저장소 생성 (Firestore 연결은 처음 사용할 때 만들어짐)
+
+    CHESSUDOKU_STORAGE=memory이면 메모리 저장소를 쓰고, Firestore 인증 파일은
+    CHESSUDOKU_FIREBASE_CREDENTIALS로 지정한다 (없으면 Application Default Credentials).
+    """
+    if os.environ.get('CHESSUDOKU_STORAGE', 'firestore') == 'memory':
+        return InMemoryPuzzleStore()
+    credentials_path = os.environ.get('CHESSUDOKU_FIREBASE_CREDENTIALS')
+    return FirestorePuzzleStore(client_factory=partial(firestore_client, credentials_path))
+
+def make_default_bank():
+    """CHESSUDOKU_PUZZLE_BANK에 지정한 로컬 퍼즐 은행 (없으면 None, 파일은 처음 조회할 때 열림)"""
+    path = os.environ.get('CHESSUDOKU_PUZZLE_BANK')
+    return PuzzleBank(path) if path else None
+
+def configure_storage(store=None, bank=None):
+    """저장소와 그 앞의 캐시, 쓰기 대기열, 퍼즐 은행을 설정
+
+    store가 없으면 make_default_store(), bank가 없으면 make_default_bank()를 사용한다.
+    """
+    global puzzle_store, puzzle_cache, write_queue, play_states, puzzle_bank, bank_cache
+    if write_queue is not None:
+        write_queue.close()
+
+    puzzle_store = store if store is not None else make_default_store()
+    puzzle_bank = bank if bank is not None else make_default_bank()
+
+    # 저장된 퍼즐은 바뀌지 않으므로 조회 결과를 메모리에 캐시
+    cache_options = dict(
+        max_size=int(os.environ.get('CHESSUDOKU_CACHE_SIZE', 1024)),
+        ttl=float(os.environ.get('CHESSUDOKU_CACHE_TTL', 3600)),
+        negative_ttl=float(os.environ.get('CHESSUDOKU_CACHE_NEGATIVE_TTL', 30)),
+    )
+    puzzle_cache = CachedPuzzleStore(puzzle_store, **cache_options)
+
+    # 퍼즐 은행의 퍼즐도 같은 캐시로 감싸 조회마다 보드를 풀고 ETag를 다시 계산하지 않음
+    bank_cache = None
+    if puzzle_bank is not None:
+        bank_cache = CachedPuzzleStore(BankDocumentStore(puzzle_bank, bank_document),
+                                       **cache_options)
+
+    # 생성한 퍼즐은 ID만 바로 돌려주고 백그라운드에서 batch로 저장
+    write_queue = WriteBehindQueue(
+        puzzle_cache,
+        max_size=int(os.environ.get('CHESSUDOKU_WRITE_QUEUE_SIZE', 1000)),
+        batch_size=int(os.environ.get('CHESSUDOKU_WRITE_BATCH_SIZE', 100)),
+        flush_interval=float(os.environ.get('CHESSUDOKU_WRITE_FLUSH_INTERVAL', 0.5)),
+    )
+
+    # 플레이 중인 퍼즐의 검증/힌트용 상태 캐시
+    play_states = PlayStateCache(
+        load_puzzle_data,
+        max_size=int(os.environ.get('CHESSUDOKU_PLAY_STATE_CACHE_SIZE', 4096)),
+    )
+
+def close_storage():
+    """쓰기 대기열에 남은 퍼즐을 저장하고 종료"""
+    if write_queue is not None:
+        write_queue.close()
+
+atexit.register(close_storage)
+
+def bank_document(result):
+    """퍼즐 은행의 조회 결과를 저장소 문서와 같은 형식으로 변환"""
+    puzzle_data = build_puzzle_payload(result, result['difficulty'])
+    return {'puzzle_data': puzzle_data, 'difficulty': result['difficulty']}
+
+def load_bank_entry(puzzle_id):
+    """퍼즐 은행의 퍼즐 (문서, ETag)를 캐시를 거쳐 조회 (은행이 없거나 없는 ID면 (None, None))"""
+    if bank_cache is None:
+        return None, None
+    return bank_cache.get_entry(puzzle_id)
+
+def load_puzzle_data(puzzle_id):
+    """저장된 퍼즐 데이터 조회 (퍼즐 은행, 아직 저장되지 않은 쓰기 대기열, 저장소 순서)"""
+    data = load_bank_entry(puzzle_id)[0]
+    if data is None:
+        data = write_queue.get(puzzle_id)
+    if data is None:
+        data = puzzle_cache.get(puzzle_id)
+    return data
+
+# 퍼즐 생성 프로세스 풀과 미리 생성한 퍼즐 풀
+# 워커 프로세스가 이 모듈을 다시 import해도 만들어지지 않도록 첫 요청 때 생성한다
+generation_service = None
+puzzle_pool = None
+services_lock = threading.Lock()
+
+# 배치 생성 요청 한 번에 만들 수 있는 최대 퍼즐 수
+MAX_BATCH_COUNT = int(os.environ.get('CHESSUDOKU_MAX_BATCH_COUNT', 10000))
+
+# 생성 탐색 계측 (CHESSUDOKU_INSTRUMENT=0이면 워커에서 계측하지 않음)
+INSTRUMENT = os.environ.get('CHESSUDOKU_INSTRUMENT', '1') != '0'
+
+metrics = MetricsRegistry()
+generation_seconds = metrics.histogram(
+    'chessudoku_generation_phase_seconds', 'Time spent per puzzle generation phase',
+    [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30])
+search_nodes = metrics.histogram(
+    'chessudoku_search_nodes', 'Search nodes visited per generated puzzle',
+    [100, 300, 1000, 3000, 10000, 30000, 100000, 300000, 1000000])
+search_backtracks = metrics.histogram(
+    'chessudoku_search_backtracks', 'Backtracks per generated puzzle',
+    [10, 30, 100, 300, 1000, 3000, 10000, 30000, 100000, 300000])
+removal_attempts = metrics.counter(
+    'chessudoku_removal_attempts_total', 'Cell removal attempts while carving puzzles')
+generated_puzzles = metrics.counter(
+    'chessudoku_generated_puzzles_total', 'Puzzles generated by worker processes')
+admission_wait_seconds = metrics.histogram(
+    'chessudoku_admission_wait_seconds', 'Time generation requests waited for a free slot',
+    [0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5])
+admission_rejections = metrics.counter(
+    'chessudoku_admission_rejections_total', 'Generation requests rejected by admission control')
+admission_active = metrics.gauge(
+    'chessudoku_admission_active', 'Generation requests currently being served')
+admission_queue_depth = metrics.gauge(
+    'chessudoku_admission_queue_depth', 'Generation requests waiting for a free slot')
+
+# 생성 요청 입장 제어: 동시에 처리하는 생성 요청은 max_active개, 기다리는 요청은 max_queue개까지만
+# 두고 나머지는 Retry-After와 함께 바로 거절 (대기열이 가득 차면 429, 기다리다 시간이 지나면 503)
+admission = AdmissionController(
+    max_active=int(os.environ.get('CHESSUDOKU_MAX_ACTIVE_GENERATIONS', 0)) or (os.cpu_count() or 1) * 2,
+    max_queue=int(os.environ.get('CHESSUDOKU_MAX_QUEUED_GENERATIONS', 64)),
+    max_wait=float(os.environ.get('CHESSUDOKU_ADMISSION_MAX_WAIT', 5)),
+)
+
+def get_generation_service():
+    """퍼즐 생성 프로세스 풀을 처음 사용할 때 만들어 반환"""
+    global generation_service
+    with services_lock:
+        if generation_service is None:
+            generation_service = GenerationService(
+                max_workers=int(os.environ.get('CHESSUDOKU_GENERATION_PROCESSES', 0)) or None,
+                max_tasks_per_child=int(os.environ.get('CHESSUDOKU_WORKER_MAX_TASKS', 100)),
+                timeout=float(os.environ.get('CHESSUDOKU_GENERATION_TIMEOUT', 30)),
+                instrument=INSTRUMENT,
+            )
+        return generation_service
+
+def observe_generation(result, difficulty):
+    """생성 결과에 담긴 탐색 계측 값을 지표에 반영"""
+    generated_puzzles.inc(difficulty=difficulty)
+    stats = result.get('stats')
+    if stats is None:
+        return
+    for phase, seconds in stats['phase_seconds'].items():
+        generation_seconds.observe(seconds, difficulty=difficulty, phase=phase)
+    search_nodes.observe(stats['nodes'], difficulty=difficulty)
+    search_backtracks.observe(stats['backtracks'], difficulty=difficulty)
+    removal_attempts.inc(stats['removals_accepted'], difficulty=difficulty, result='accepted')
+    removal_attempts.inc(stats['removals_rejected'], difficulty=difficulty, result='rejected')
+
+def generate_observed(*, difficulty='medium', piece_config=None):
+    """워커 프로세스에서 퍼즐을 생성하고 계측 값을 지표에 반영"""
+    result = get_generation_service().generate(difficulty=difficulty, piece_config=piece_config)
+    observe_generation(result, difficulty)
+    return result
+
+def admit_generation(endpoint):
+    """생성 요청의 처리 슬롯을 얻고 기다린 시간을 지표에 반영 (거절되면 AdmissionRejected)"""
+    try:
+        waited = admission.acquire()
+    except AdmissionRejected as e:
+        admission_rejections.inc(endpoint=endpoint, status=e.status)
+        raise
+    admission_wait_seconds.observe(waited, endpoint=endpoint)
+
+def rejection_response(error):
+    """입장 거절 응답 (429 또는 503, Retry-After 헤더 포함)"""
+    response = jsonify({'error': str(error), 'retry_after': error.retry_after})
+    response.status_code = error.status
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+def get_puzzle_pool():
+    """퍼즐 풀을 처음 사용할 때 만들어 반환"""
+    global puzzle_pool
+    get_generation_service()
+    with services_lock:
+        if puzzle_pool is None:
+            puzzle_pool = PuzzlePool(
+                generate=generate_observed,
+                low_watermark=int(os.environ.get('CHESSUDOKU_POOL_LOW_WATERMARK', 2)),
+                high_watermark=int(os.environ.get('CHESSUDOKU_POOL_HIGH_WATERMARK', 8)),
+                workers=int(os.environ.get('CHESSUDOKU_POOL_WORKERS', 2)),
+                max_keys=int(os.environ.get('CHESSUDOKU_POOL_MAX_KEYS', 64)),
+                min_demand=int(os.environ.get('CHESSUDOKU_POOL_MIN_DEMAND', 2)),
+            )
+            # 기본 기물 배치는 난이도별로 미리 채워 둠
+            for level in DIFFICULTY_LEVELS:
+                puzzle_pool.warm(level)
+        return puzzle_pool
+
+def parse_pieces(pieces):
+    """요청의 pieces 데이터를 (종류, 행, 열) 튜플 목록으로 변환
+
+    [종류, 행, 열] 리스트나 {'type', 'position': [행, 열]} 딕셔너리가 아닌 항목은
+    InvalidPieceConfig로 거부한다 (종류와 위치 값은 validate_piece_config가 검사).
+    """
+    if not pieces:
+        return pieces
+    if not isinstance(pieces, list):
+        raise InvalidPieceConfig(f"pieces must be a list: {pieces!r}")
+
+    formatted_pieces = []
+    for piece in pieces:
+        # piece가 리스트 형태로 오므로 튜플로 변환
+        if isinstance(piece, list):
+            formatted_pieces.append(tuple(piece))
+        elif isinstance(piece, dict) and 'type' in piece and \
+                isinstance(piece.get('position'), list) and len(piece['position']) == 2:
+            pos = piece['position']
+            formatted_pieces.append((piece['type'], pos[0], pos[1]))
+        else:
+            raise InvalidPieceConfig(f"Malformed piece entry: {piece!r}")
+    return formatted_pieces
+
+# 응답 형식: full(to_dict 그대로), compact(81자 숫자 문자열 + 기물 목록), packed(base64 바이트열)
+RESPONSE_FORMATS = {
+    'full': 'application/json',
+    'compact': 'application/vnd.chessudoku.compact+json',
+    'packed': 'application/vnd.chessudoku.packed+json',
+}
+
+def negotiate_format(data=None):
+    """format 쿼리/본문 값이나 Accept 헤더로 응답 형식 결정"""
+    fmt = request.args.get('format') or (data or {}).get('format')
+    if fmt is None:
+        for name, mimetype in RESPONSE_FORMATS.items():
+            if name != 'full' and mimetype in request.accept_mimetypes.values():
+                return name
+        return 'full'
+    if fmt not in RESPONSE_FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    return fmt
+
+def encode_board(board, fmt):
+    """보드를 지정한 응답 형식으로 변환"""
+    if fmt == 'compact':
+        return board.to_compact()
+    if fmt == 'packed':
+        return base64.b64encode(board.to_packed()).decode('ascii')
+    return board.to_dict()
+
+def result_puzzle_id(result, difficulty):
+    """생성 결과의 퍼즐 ID (퍼즐 은행 결과는 저장된 ID, 나머지는 seed로 만든 puzzle_content_id)"""
+    if 'puzzle_id' in result:
+        return result['puzzle_id']
+    pieces = [(piece, row, col) for piece, positions in result['puzzle'].piece_positions.items()
+              for row, col in positions]
+    return puzzle_content_id(result['seed'], difficulty, pieces, result.get('variant'))
+
+def build_puzzle_payload(result, difficulty, fmt='full'):
+    """generate_puzzle 결과를 API 응답 형식으로 변환
+
+    compact/packed 형식에서는 removed_cells를 보내지 않는다 (퍼즐의 빈 칸과 정답으로 계산 가능).
+    seed를 아는 결과는 같은 퍼즐을 다시 요청할 수 있도록 'seed'도 담는다 (변환으로 만든 퍼즐은
+    seed만으로 다시 만들 수 없으므로 제외).
+    """
+    if fmt != 'full':
+        payload = {
+            'puzzle_data': {
+                'puzzle': encode_board(result['puzzle'], fmt),
+                'solution': encode_board(result['solution'], fmt),
+            },
+            'puzzle_id': result_puzzle_id(result, difficulty),
+            'difficulty': difficulty,
+            'format': fmt
+        }
+    else:
+        payload = {
+            'puzzle_data': {
+                'puzzle': result['puzzle'].to_dict(),
+                'solution': result['solution'].to_dict(),
+                'removed_cells': result['removed_cells']
+            },
+            'puzzle_id': result_puzzle_id(result, difficulty),
+            'difficulty': difficulty
+        }
+    if 'seed' in result and 'variant' not in result:
+        payload['seed'] = result['seed']
+    return payload
+
+def stored_result(data, puzzle_id):
+    """저장된 퍼즐 문서를 generate_puzzle 결과 형식으로 복원 (다른 응답 형식으로 보낼 때 사용)"""
+    puzzle_data = data['puzzle_data']['puzzle_data']
+    result = {
+        'puzzle': ChessSudokuBoard.from_dict(puzzle_data['puzzle']),
+        'solution': ChessSudokuBoard.from_dict(puzzle_data['solution']),
+        'removed_cells': puzzle_data['removed_cells'],
+        'puzzle_id': puzzle_id,
+    }
+    if 'seed' in data['puzzle_data']:
+        result['seed'] = data['puzzle_data']['seed']
+    return result
+
+def parse_seed(seed):
+    """요청의 seed 검사 (없으면 None, 0 이상 2**63 미만의 정수만 허용)"""
+    if seed is None:
+        return None
+    if not isinstance(seed, int) or isinstance(seed, bool) or not 0 <= seed < 2 ** 63:
+        raise ValueError("seed must be an integer between 0 and 2**63 - 1")
+    return seed
+
+def format_response(payload, fmt):
+    """응답 형식에 맞는 mimetype으로 JSON 응답 생성"""
+    response = jsonify(payload)
+    response.mimetype = RESPONSE_FORMATS[fmt]
+    return response
 
 def board_to_json(board):
     """체스 스도쿠 보드를 JSON 형식으로 변환"""
@@ -36,72 +369,328 @@ def board_to_json(board):
         result['board'].append(row)
     return result
 
-@app.route('/')
+@api.route('/')
 def hello():
     return 'Hello, Welcome ChesSudoku!'
 
-@app.route('/generate', methods=['POST'])
+@api.route('/generate', methods=['POST'])
 def generate_puzzle_endpoint():
     try:
         data = request.get_json()
-        difficulty = data.get('difficulty', 'medium')
-        pieces = data.get('pieces', None)
-        
-        # pieces 데이터 형식 변환: 리스트를 튜플로 변환
-        if pieces:
-            formatted_pieces = []
-            for piece in pieces:
-                # piece가 리스트 형태로 오므로 튜플로 변환
-                if isinstance(piece, list):
-                    formatted_pieces.append(tuple(piece))
-                elif isinstance(piece, dict):
-                    pos = piece['position']
-                    formatted_pieces.append((piece['type'], pos[0], pos[1]))
-            pieces = formatted_pieces
+        # 알 수 없는 난이도는 'medium'으로 생성되므로 ID, 응답, 지표에도 같은 값을 사용
+        difficulty = normalize_difficulty(data.get('difficulty', 'medium'))
+        try:
+            fmt = negotiate_format(data)
+            seed = parse_seed(data.get('seed'))
+            # 잘못되었거나 채울 수 없는 기물 배치는 워커를 쓰기 전에 거부
+            pieces = parse_pieces(data.get('pieces', None))
+            check_piece_config(pieces)
+        except InvalidPieceConfig as e:
+            return jsonify({'error': str(e)}), 422
+        except (TypeError, ValueError, KeyError) as e:
+            return jsonify({'error': f'Invalid request: {e}'}), 400
+
+        if seed is not None:
+            # seed를 주면 ID가 (seed, 난이도, 기물 배치)로 정해지므로 이미 있는 퍼즐은 그대로 응답
+            puzzle_id = puzzle_content_id(seed, difficulty, pieces)
+            stored = load_puzzle_data(puzzle_id)
+            if stored is not None:
+                if fmt == 'full':
+                    return jsonify(stored['puzzle_data'])
+                return format_response(build_puzzle_payload(stored_result(stored, puzzle_id),
+                                                            difficulty, fmt), fmt)
+        else:
+            # 퍼즐 은행에 같은 (난이도, 기물 배치)의 퍼즐이 있으면 생성과 저장 없이 바로 응답
+            banked = puzzle_bank.sample(difficulty, pieces) if puzzle_bank is not None else None
+            if banked is not None:
+                return format_response(build_puzzle_payload(banked, difficulty, fmt), fmt)
         
-        # 퍼즐 생성
-        result = generate_puzzle(difficulty=difficulty, piece_config=pieces)
+        # seed가 없으면 variant가 참일 때 같은 키로 이미 만든 퍼즐을 숫자 치환과 (기물 배치를
+        # 유지하는) 대칭 변환으로 바꿔 탐색 없이 응답하거나 퍼즐 풀에서 꺼냄
+        result = None
+        if seed is None:
+            pool = get_puzzle_pool()
+            template = pool.template(difficulty, pieces) if data.get('variant') else None
+            if template is not None:
+                result = random_variant(template, layout_symmetries(pieces))
+            else:
+                result = pool.try_get(difficulty, pieces)
+
+        # seed를 주었거나 풀이 비어 있으면 바로 생성
+        # 생성은 입장 제어를 통과한 요청만 진행 (슬롯이 없으면 잠시 기다리거나 바로 거절)
+        if result is None:
+            admit_generation('generate')
+            started = time.monotonic()
+            try:
+                if seed is not None:
+                    result = get_generation_service().generate(difficulty=difficulty,
+                                                               piece_config=pieces, seed=seed)
+                    observe_generation(result, difficulty)
+                else:
+                    result = pool.generate_now(difficulty, pieces)
+            finally:
+                admission.release(time.monotonic() - started)
+        puzzle_data = build_puzzle_payload(result, difficulty)
         
-        puzzle_data = {
-            'puzzle_data': {  
-                'puzzle': result['puzzle'].to_dict(),
-                'solution': result['solution'].to_dict(),
-                'removed_cells': result['removed_cells']
-            },
-            'puzzle_id': 'some_unique_id',
+        # 저장은 백그라운드에서 진행하고 ID는 바로 응답 (저장 형식은 항상 full)
+        write_queue.put({
+            'puzzle_data': puzzle_data,
             'difficulty': difficulty
-        }
-        
-        # # Firebase에 저장
-        # doc_ref = db.collection('puzzles').document()
-        # doc_ref.set({
-        #     'puzzle_data': puzzle_data,
-        #     'difficulty': difficulty,
-        #     'created_at': firestore.SERVER_TIMESTAMP
-        # })
-        
-        # puzzle_data['puzzle_id'] = doc_ref.id
+        }, puzzle_data['puzzle_id'])
+
+        if fmt != 'full':
+            return format_response(build_puzzle_payload(result, difficulty, fmt), fmt)
         return jsonify(puzzle_data)
+
+    except AdmissionRejected as e:
+        return rejection_response(e)
+
+    except WriteQueueFull as e:
+        return jsonify({'error': str(e)}), 503
+
+    except GenerationTimeout as e:
+        return jsonify({'error': str(e)}), 503
+
+    except InvalidPieceConfig as e:
+        return jsonify({'error': str(e)}), 422
         
     except Exception as e:
         import traceback
         print(traceback.format_exc())  # 서버 콘솔에 상세 에러 출력
         return jsonify({'error': str(e)}), 500
 
-@app.route('/puzzles/<puzzle_id>', methods=['GET'])
+def store_batch_result(result, difficulty, fmt):
+    """배치 결과를 쓰기 대기열에 넣고 응답 줄 반환 (대기열이 가득 차면 puzzle_id 없이)"""
+    puzzle_data = build_puzzle_payload(result, difficulty)
+    stored = True
+    try:
+        write_queue.put({
+            'puzzle_data': puzzle_data,
+            'difficulty': difficulty
+        }, puzzle_data['puzzle_id'])
+    except WriteQueueFull:
+        stored = False
+
+    # 대기열의 문서를 바꾸지 않도록 응답 줄은 복사본으로 만듦
+    line = dict(puzzle_data) if fmt == 'full' else build_puzzle_payload(result, difficulty, fmt)
+    if not stored:
+        del line['puzzle_id']
+    return line
+
+@api.route('/generate/batch', methods=['POST'])
+def generate_batch_endpoint():
+    """퍼즐 count개를 워커 프로세스에 나눠 생성하고, 완성되는 대로 한 줄씩 NDJSON으로 전송
+
+    동시에 진행 중인 작업은 워커 수의 두 배까지만 두므로 count와 무관하게 메모리가 일정하며,
+    클라이언트가 연결을 끊으면 아직 시작하지 않은 작업은 취소된다. 배치 하나는 전송이 끝날
+    때까지 입장 제어 슬롯 하나를 차지한다. 생성한 퍼즐은 /generate와 같이 쓰기 대기열로 저장하므로
+    줄마다의 puzzle_id로 조회할 수 있으며, 대기열이 가득 차 저장하지 못한 퍼즐은 puzzle_id 없이
+    seed만 보낸다 (같은 seed로 /generate를 요청하면 다시 만들 수 있음).
+    """
+    data = request.get_json() or {}
+    difficulty = normalize_difficulty(data.get('difficulty', 'medium'))
+    try:
+        count = int(data.get('count', 1))
+        pieces = parse_pieces(data.get('pieces', None))
+        fmt = negotiate_format(data)
+        check_piece_config(pieces)
+    except InvalidPieceConfig as e:
+        return jsonify({'error': str(e)}), 422
+    except (TypeError, ValueError, KeyError) as e:
+        return jsonify({'error': f'Invalid request: {e}'}), 400
+    if not 1 <= count <= MAX_BATCH_COUNT:
+        return jsonify({'error': f'count must be between 1 and {MAX_BATCH_COUNT}'}), 400
+
+    try:
+        admit_generation('batch')
+    except AdmissionRejected as e:
+        return rejection_response(e)
+    started = time.monotonic()
+
+    service = get_generation_service()
+    window = service.max_workers * 2
+
+    def stream():
+        pending = {}
+        submitted = 0
+        try:
+            while submitted < count or pending:
+                while submitted < count and len(pending) < window:
+                    pending[service.submit(difficulty, pieces)] = submitted
+                    submitted += 1
+
+                done, _ = wait(pending, timeout=service.timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    yield json.dumps({'error': 'Puzzle generation timed out'}) + '\n'
+                    return
+
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        result = future.result()
+                        observe_generation(result, difficulty)
+                        line = store_batch_result(result, difficulty, fmt)
+                    except Exception as e:
+                        line = {'error': str(e)}
+                    line['index'] = index
+                    yield json.dumps(line) + '\n'
+        finally:
+            # 연결이 끊기거나 중단되면 아직 시작하지 않은 작업 취소
+            for future in pending:
+                future.cancel()
+
+    response = Response(stream(), mimetype='application/x-ndjson')
+    # 전송이 끝나거나 연결이 끊겨 응답이 닫힐 때 슬롯 반환 (스트림을 시작하지 않은 경우 포함)
+    response.call_on_close(lambda: admission.release(time.monotonic() - started))
+    return response
+
+@api.route('/storage/stats', methods=['GET'])
+def storage_stats():
+    """쓰기 대기열 길이와 저장 통계 조회"""
+    return jsonify(write_queue.snapshot())
+
+@api.route('/bank/stats', methods=['GET'])
+def bank_stats():
+    """퍼즐 은행의 (난이도, 기물 배치)별 저장된 퍼즐 수와 조회 캐시 통계 조회"""
+    if puzzle_bank is None:
+        return jsonify({'error': 'Puzzle bank is not configured'}), 404
+    return jsonify({'layouts': puzzle_bank.snapshot(), 'cache': bank_cache.snapshot()})
+
+@api.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """퍼즐 조회 캐시의 hit/miss 통계 조회"""
+    return jsonify(puzzle_cache.snapshot())
+
+@api.route('/pool/stats', methods=['GET'])
+def pool_stats():
+    """퍼즐 풀의 키별 hits, misses, depth, refill 지연 시간 조회"""
+    return jsonify({'pools': get_puzzle_pool().snapshot()})
+
+@api.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """생성 단계별 시간, 탐색 노드/되돌림, 입장 대기 시간과 대기열 길이를 Prometheus 텍스트 형식으로 조회"""
+    snapshot = admission.snapshot()
+    admission_active.set(snapshot['active'])
+    admission_queue_depth.set(snapshot['waiting'])
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/admission/stats', methods=['GET'])
+def admission_stats():
+    """생성 요청 입장 제어의 처리 중/대기 중 요청 수와 거절, 대기 시간 통계 조회"""
+    return jsonify(admission.snapshot())
+
+@api.route('/play/stats', methods=['GET'])
+def play_stats():
+    """검증/힌트용 퍼즐 상태 캐시의 hit/miss 통계 조회"""
+    return jsonify(play_states.snapshot())
+
+def load_play_request(puzzle_id):
+    """요청의 moves를 읽어 (퍼즐 상태, 수 목록) 반환 (오류면 (None, 오류 응답))"""
+    data = request.get_json(silent=True) or {}
+    try:
+        moves = parse_moves(data.get('moves', []))
+    except ValueError as e:
+        return None, (jsonify({'error': str(e)}), 400)
+
+    state = play_states.get(puzzle_id)
+    if state is None:
+        return None, (jsonify({'error': 'Puzzle not found'}), 404)
+    return state, moves
+
+@api.route('/puzzles/<puzzle_id>/validate', methods=['POST'])
+def validate_moves(puzzle_id):
+    """클라이언트의 수 목록([[행, 열, 숫자], ...])을 차례로 검사
+
+    수마다 is_valid_number 규칙으로 놓을 수 있는지(valid)와 정답인지(correct)를 돌려준다.
+    """
+    state, moves = load_play_request(puzzle_id)
+    if state is None:
+        return moves
+    board, results = state.apply(moves)
+    return jsonify({'results': results, 'complete': state.is_complete(board)})
+
+@api.route('/puzzles/<puzzle_id>/hint', methods=['POST'])
+def hint_move(puzzle_id):
+    """클라이언트의 수 목록을 반영한 보드에서 다음에 채울 칸과 숫자 추천"""
+    state, moves = load_play_request(puzzle_id)
+    if state is None:
+        return moves
+    board, _ = state.apply(moves)
+    return jsonify({'hint': state.hint(board), 'complete': state.is_complete(board)})
+
+@api.route('/puzzles/<puzzle_id>', methods=['GET'])
 def get_puzzle(puzzle_id):
     """저장된 퍼즐 조회"""
     try:
-        doc_ref = db.collection('puzzles').document(puzzle_id)
-        doc = doc_ref.get()
+        # 퍼즐 은행과 저장소의 퍼즐은 캐시를 거쳐, 아직 저장되지 않은 퍼즐은 쓰기 대기열에서 조회
+        # 본문과 ETag는 모두 저장소 필드(created_at)를 뺀 같은 문서로 만들므로 저장 전후로 같다
+        pending = False
+        data, etag = load_bank_entry(puzzle_id)
+        if data is None:
+            data = served_document(write_queue.get(puzzle_id))
+            if data is not None:
+                pending = True
+                etag = compute_etag(data)
+            else:
+                data, etag = puzzle_cache.get_entry(puzzle_id)
         
-        if not doc.exists:
+        if data is None:
             return jsonify({'error': 'Puzzle not found'}), 404
-            
-        return jsonify(doc.to_dict())
+
+        # 저장된 퍼즐은 바뀌지 않으므로 클라이언트와 CDN이 오래 캐시하고 If-None-Match로 304를
+        # 받도록 함. 아직 쓰기 대기열에 있는 퍼즐은 저장이 실패할 수 있으므로 매번 다시 확인하게 함
+        response = jsonify(data)
+        response.set_etag(etag)
+        if pending:
+            response.headers['Cache-Control'] = 'no-cache'
+        else:
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response.make_conditional(request)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api.route('/healthz', methods=['GET'])
+def healthz():
+    """프로세스가 요청에 응답할 수 있는지 확인 (저장소나 워커는 확인하지 않음)"""
+    return jsonify({'status': 'ok'})
+
+@api.route('/readyz', methods=['GET'])
+def readyz():
+    """저장소 클라이언트를 만들 수 있고 쓰기 대기열이 열려 있으면 (퍼즐 은행을 쓰면 은행도 열리면) 200, 아니면 503"""
+    checks = {}
+    try:
+        puzzle_store.ready()
+        checks['storage'] = 'ok'
+    except Exception as e:
+        checks['storage'] = f'error: {e}'
+    checks['write_queue'] = 'closed' if write_queue.closed else 'ok'
+    if puzzle_bank is not None:
+        try:
+            puzzle_bank.ready()
+            checks['puzzle_bank'] = 'ok'
+        except Exception as e:
+            checks['puzzle_bank'] = f'error: {e}'
+
+    ready = all(status == 'ok' for status in checks.values())
+    return jsonify({'status': 'ready' if ready else 'not ready', 'checks': checks}), \
+        200 if ready else 503
+
+def create_app(store=None, bank=None):
+    """Flask 앱 생성
+
+    import와 앱 생성은 저장소에 연결하거나 스레드, 프로세스를 만들지 않으므로 gunicorn
+    --preload로 미리 불러온 뒤 fork해도 된다. Firestore 클라이언트, 쓰기 스레드, 생성 워커는
+    각 프로세스에서 처음 필요할 때 만들어진다. store와 bank(PuzzleBank)를 넘기면 기본 저장소와
+    CHESSUDOKU_PUZZLE_BANK 대신 사용한다.
+    """
+    configure_storage(store, bank)
+    app = Flask(__name__)
+    app.register_blueprint(api)
+    return app
+
+# gunicorn 'chessudoku_api_server:app'이나 직접 실행할 때 쓰는 기본 앱
+app = create_app()
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,94 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from chessudoku import GenerationTimeout, generate_puzzle
+
+
+def _generate_task(difficulty, piece_config, instrument=False, timeout=None, seed=None):
+    """워커 프로세스에서 실행되는 생성 작업 (pickle 가능한 최상위 함수여야 함)"""
+    return generate_puzzle(difficulty=difficulty, piece_config=piece_config,
+                           instrument=instrument, timeout=timeout, seed=seed)
+
+
+class GenerationService:
+    """퍼즐 생성을 ProcessPoolExecutor로 여러 코어에 분산하는 서비스
+
+    퍼즐 생성은 GIL을 잡고 도는 순수 파이썬 연산이므로 스레드 대신 프로세스를 쓴다.
+    워커당 평균 max_tasks_per_child개의 작업을 제출하면 executor를 새로 만들어 워커를
+    교체하고, 이전 executor는 남은 작업을 마친 뒤 종료된다. (Python 3.11의
+    ProcessPoolExecutor(max_tasks_per_child=...)는 대기 작업이 있을 때 멈출 수 있어 쓰지 않는다.)
+    워커에서도 같은 제한 시간으로 generate_puzzle을 실행하므로 시간을 넘긴 작업은 워커에서
+    GenerationTimeout으로 중단되고, 호출한 쪽도 제한 시간이 지나면 GenerationTimeout을 받는다.
+    instrument가 참이면 결과에 탐색 계측 값('stats')이 포함된다.
+    """
+
+    def __init__(self, max_workers=None, max_tasks_per_child=100, timeout=30.0,
+                 instrument=False):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_tasks_per_child = max_tasks_per_child
+        self.timeout = timeout
+        self.instrument = instrument
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.executor = self._create_executor()
+
+    def _create_executor(self):
+        # 스레드가 도는 서버 프로세스를 fork하지 않도록 spawn 방식 사용
+        return ProcessPoolExecutor(max_workers=self.max_workers,
+                                   mp_context=multiprocessing.get_context('spawn'))
+
+    def _restart(self, broken):
+        """워커가 비정상 종료되어 깨진 executor를 새로 만듦"""
+        with self.lock:
+            if self.executor is broken:
+                self.executor = self._create_executor()
+                self.submitted = 0
+                broken.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, difficulty, piece_config, seed=None):
+        """생성 작업을 제출하고 (사용한 executor, Future) 반환"""
+        with self.lock:
+            if self.max_tasks_per_child and \
+                    self.submitted >= self.max_tasks_per_child * self.max_workers:
+                # 워커 교체: 이전 executor는 이미 받은 작업을 끝낸 뒤 종료됨
+                self.executor.shutdown(wait=False)
+                self.executor = self._create_executor()
+                self.submitted = 0
+            self.submitted += 1
+            executor = self.executor
+
+        try:
+            return executor, executor.submit(_generate_task, difficulty, piece_config,
+                                             self.instrument, self.timeout, seed)
+        except BrokenProcessPool:
+            self._restart(executor)
+            executor = self.executor
+            return executor, executor.submit(_generate_task, difficulty, piece_config,
+                                             self.instrument, self.timeout, seed)
+
+    def submit(self, difficulty='medium', piece_config=None, seed=None):
+        """생성 작업을 제출하고 Future 반환"""
+        return self._submit(difficulty, piece_config, seed)[1]
+
+    def generate(self, *, difficulty='medium', piece_config=None, timeout=None, seed=None):
+        """워커 프로세스에서 퍼즐을 생성하고 결과를 기다림 (generate_puzzle과 같은 형식)"""
+        limit = self.timeout if timeout is None else timeout
+        executor, future = self._submit(difficulty, piece_config, seed)
+        try:
+            return future.result(timeout=limit)
+        except GenerationTimeout:
+            # 워커에서 한도를 넘겨 중단된 작업 (FutureTimeoutError보다 먼저 처리해야 함)
+            raise
+        except FutureTimeoutError:
+            future.cancel()
+            raise GenerationTimeout(f"Puzzle generation exceeded {limit}s")
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+
+    def shutdown(self, wait=True):
+        """워커 프로세스 종료"""
+        self.executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,271 @@
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from benchmark import PIECE_CATALOGUE, percentile
+from chessudoku import DIFFICULTY_LEVELS
+
+# 요청 종류별 기본 비율: 난이도별 생성, 사용자 지정 기물 배치 생성, ID로 조회
+DEFAULT_MIX = {'generate': 6, 'pieces': 2, 'get': 2}
+
+# 조회 요청에 쓸 퍼즐 ID를 최대 몇 개까지 기억할지
+MAX_KNOWN_IDS = 10000
+
+
+def parse_mix(text):
+    """'generate=6,pieces=2,get=2' 형식의 요청 비율 파싱"""
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown request kind: {kind}")
+        try:
+            mix[kind] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid weight for {kind}: {weight!r}")
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("At least one request kind needs a positive weight")
+    return mix
+
+
+def summarize(latencies, statuses, duration):
+    """지연 시간(초) 목록과 상태 코드 개수로 처리량, 지연 분위수(ms) 요약"""
+    if not latencies:
+        return {'requests': 0}
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'throughput_rps': len(ordered) / duration if duration else 0.0,
+        'statuses': dict(sorted((str(status), count) for status, count in statuses.items())),
+        'latency_ms': {
+            'mean': sum(ordered) / len(ordered) * 1000,
+            'p50': percentile(ordered, 0.50) * 1000,
+            'p95': percentile(ordered, 0.95) * 1000,
+            'p99': percentile(ordered, 0.99) * 1000,
+            'max': ordered[-1] * 1000,
+        },
+    }
+
+
+class InProcessClient:
+    """Flask 테스트 클라이언트로 앱을 같은 프로세스에서 호출 (저장소는 메모리 저장소)"""
+
+    def __init__(self, write_delay=0.0):
+        import chessudoku_api_server as server
+        from puzzle_store import InMemoryPuzzleStore
+
+        self.server = server
+        self.app = server.create_app(InMemoryPuzzleStore(write_delay=write_delay))
+        self.local = threading.local()
+
+    def _client(self):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        return client
+
+    def post(self, path, data):
+        response = self._client().post(path, json=data)
+        return response.status_code, response.get_json(silent=True)
+
+    def get(self, path):
+        response = self._client().get(path)
+        return response.status_code, response.get_json(silent=True)
+
+    def close(self):
+        # 처음 요청 때 만든 퍼즐 풀과 생성 워커 프로세스 정리
+        if self.server.puzzle_pool is not None:
+            self.server.puzzle_pool.close()
+        if self.server.generation_service is not None:
+            self.server.generation_service.shutdown()
+        self.server.close_storage()
+
+
+class HttpClient:
+    """실행 중인 서버(예: http://localhost:5000)에 HTTP로 요청 (스레드마다 세션 하나)"""
+
+    def __init__(self, base_url, timeout=60.0):
+        import requests
+
+        self.requests = requests
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def _session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = self.requests.Session()
+        return session
+
+    def _send(self, method, path, **kwargs):
+        try:
+            response = self._session().request(method, self.base_url + path,
+                                               timeout=self.timeout, **kwargs)
+        except self.requests.RequestException:
+            return 'error', None
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
+
+    def post(self, path, data):
+        return self._send('POST', path, json=data)
+
+    def get(self, path):
+        return self._send('GET', path)
+
+    def close(self):
+        pass
+
+
+class LoadTest:
+    """요청 비율(mix)에 따라 concurrency개 스레드로 요청을 보내고 지연 시간을 기록
+
+    'generate'는 난이도를 골라 기본 배치로, 'pieces'는 benchmark의 기물 배치 중 하나로 생성을
+    요청하고, 'get'은 앞서 생성된 퍼즐 ID로 /puzzles/<id>를 조회한다 (아직 ID가 없으면 생성).
+    total개를 보내거나 duration초가 지나면 끝난다.
+    """
+
+    def __init__(self, client, concurrency=8, total=200, duration=None, mix=None,
+                 difficulties=None, seed=0):
+        self.client = client
+        self.concurrency = concurrency
+        self.total = total
+        self.duration = duration
+        self.mix = mix or DEFAULT_MIX
+        self.difficulties = difficulties or list(DIFFICULTY_LEVELS)
+        self.seed = seed
+
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.known_ids = []
+        self.samples = []   # (종류, 상태 코드, 지연 시간)
+
+    def _next_request(self, deadline):
+        """보낼 요청이 남았으면 True (전체 개수와 마감 시각 확인)"""
+        with self.lock:
+            if self.total is not None and self.sent >= self.total:
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self.sent += 1
+            return True
+
+    def _request(self, kind, rng):
+        """요청 하나를 보내고 (실제로 보낸 종류, 상태 코드) 반환"""
+        if kind == 'get':
+            with self.lock:
+                puzzle_id = rng.choice(self.known_ids) if self.known_ids else None
+            if puzzle_id is not None:
+                return kind, self.client.get(f'/puzzles/{puzzle_id}')[0]
+            kind = 'generate'
+
+        data = {'difficulty': rng.choice(self.difficulties)}
+        if kind == 'pieces':
+            data['pieces'] = [list(piece) for piece in rng.choice(list(PIECE_CATALOGUE.values()))]
+        status, body = self.client.post('/generate', data)
+        if status == 200 and body and 'puzzle_id' in body:
+            with self.lock:
+                if len(self.known_ids) < MAX_KNOWN_IDS:
+                    self.known_ids.append(body['puzzle_id'])
+        return kind, status
+
+    def _worker(self, index, deadline):
+        rng = random.Random(self.seed + index)
+        kinds = list(self.mix)
+        weights = [self.mix[kind] for kind in kinds]
+        samples = []
+        while self._next_request(deadline):
+            kind = rng.choices(kinds, weights)[0]
+            start = time.perf_counter()
+            kind, status = self._request(kind, rng)
+            samples.append((kind, status, time.perf_counter() - start))
+        with self.lock:
+            self.samples.extend(samples)
+
+    def run(self):
+        """부하를 걸고 결과 요약(JSON으로 바꿀 수 있는 딕셔너리) 반환"""
+        deadline = time.monotonic() + self.duration if self.duration else None
+        threads = [threading.Thread(target=self._worker, args=(index, deadline))
+                   for index in range(self.concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        by_kind = {}
+        for kind in self.mix:
+            rows = [(status, latency) for k, status, latency in self.samples if k == kind]
+            by_kind[kind] = summarize([latency for _, latency in rows],
+                                      Counter(status for status, _ in rows), elapsed)
+        overall = summarize([latency for _, _, latency in self.samples],
+                            Counter(status for _, status, _ in self.samples), elapsed)
+        return {'duration_s': elapsed, 'overall': overall, 'by_kind': by_kind}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="체스 스도쿠 API 부하 테스트 (결과는 JSON)")
+    parser.add_argument('--url', help="실행 중인 서버 주소 (예: http://localhost:5000, 없으면 "
+                                      "메모리 저장소로 앱을 같은 프로세스에서 실행)")
+    parser.add_argument('--concurrency', type=int, default=8, help="동시에 요청하는 스레드 수")
+    parser.add_argument('--requests', type=int, default=200, help="보낼 전체 요청 수")
+    parser.add_argument('--duration', type=float, help="요청을 보낼 시간(초), 주면 --requests 대신 사용")
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help="요청 종류별 비율 (기본 'generate=6,pieces=2,get=2')")
+    parser.add_argument('--difficulty', nargs='+', choices=list(DIFFICULTY_LEVELS),
+                        default=list(DIFFICULTY_LEVELS))
+    parser.add_argument('--write-delay', type=float, default=0.0,
+                        help="같은 프로세스 실행 시 메모리 저장소의 batch 저장 지연(초)")
+    parser.add_argument('--seed', type=int, default=0, help="요청 종류와 난이도 선택용 난수 seed")
+    parser.add_argument('--output', help="결과를 저장할 파일 (없으면 표준 출력)")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        client = HttpClient(args.url)
+    else:
+        client = InProcessClient(write_delay=args.write_delay)
+
+    test = LoadTest(client, concurrency=args.concurrency,
+                    total=None if args.duration else args.requests, duration=args.duration,
+                    mix=args.mix, difficulties=args.difficulty, seed=args.seed)
+    try:
+        results = test.run()
+    finally:
+        client.close()
+
+    report = {
+        'config': {
+            'target': args.url or 'in-process',
+            'concurrency': args.concurrency,
+            'requests': None if args.duration else args.requests,
+            'duration': args.duration,
+            'mix': args.mix,
+            'difficulty': args.difficulty,
+            'seed': args.seed,
+        },
+    }
+    report.update(results)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    overall = results['overall']
+    if overall['requests']:
+        print(f"{overall['requests']} requests, {overall['throughput_rps']:.1f} req/s, "
+              f"p50 {overall['latency_ms']['p50']:.1f} ms, p99 {overall['latency_ms']['p99']:.1f} ms",
+              file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
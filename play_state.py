@@ -0,0 +1,170 @@
+import threading
+from collections import OrderedDict
+
+from chessudoku import ChessSudokuBoard, POPCOUNT
+
+
+def parse_moves(moves):
+    """[[행, 열, 숫자], ...] 형식의 수 목록 검사 (숫자가 0이나 None이면 지우기)"""
+    if not isinstance(moves, list):
+        raise ValueError("moves must be a list of [row, col, value]")
+    parsed = []
+    for move in moves:
+        if not isinstance(move, (list, tuple)) or len(move) != 3:
+            raise ValueError(f"Invalid move: {move}")
+        row, col, value = move
+        value = value or 0
+        for number, upper in ((row, 8), (col, 8), (value, 9)):
+            if not isinstance(number, int) or isinstance(number, bool) or not 0 <= number <= upper:
+                raise ValueError(f"Invalid move: {move}")
+        parsed.append((row, col, value))
+    return parsed
+
+
+class PuzzlePlayState:
+    """저장된 퍼즐 하나의 풀이 상태 (퍼즐 보드와 정답)
+
+    요청마다 퍼즐 보드를 clone()하고 수를 place_number/remove_number로 하나씩 반영하므로
+    from_dict로 보드를 다시 만들지 않으며, 원래 보드는 바뀌지 않아 여러 요청이 공유할 수 있다.
+    """
+
+    def __init__(self, puzzle, solution):
+        self.puzzle = puzzle
+        self.solution = bytes(solution.grid)
+        # 처음부터 채워져 있거나 기물이 있는 칸은 바꿀 수 없음
+        self.fixed = bytes(code != 0 for code in puzzle.grid)
+
+    @classmethod
+    def from_data(cls, data):
+        """저장된 퍼즐 문서에서 상태 생성
+
+        /generate가 저장하는 문서는 응답 전체를 'puzzle_data'에 담으므로 보드는
+        data['puzzle_data']['puzzle_data'] 안에 있다.
+        """
+        puzzle_data = data['puzzle_data']
+        if 'puzzle_data' in puzzle_data:
+            puzzle_data = puzzle_data['puzzle_data']
+        return cls(ChessSudokuBoard.from_dict(puzzle_data['puzzle']),
+                   ChessSudokuBoard.from_dict(puzzle_data['solution']))
+
+    def apply(self, moves):
+        """수를 차례로 반영한 보드와 수마다의 결과 목록 반환
+
+        is_valid_number를 통과한 수만 보드에 반영한다. 결과의 reason은 바꿀 수 없는 칸이면
+        'fixed', 규칙에 어긋나면 'conflict'이며, correct는 정답과 같은지 여부이다.
+        """
+        board = self.puzzle.clone()
+        grid = board.grid
+        results = []
+        for row, col, value in moves:
+            idx = row * 9 + col
+            entry = {'row': row, 'col': col, 'value': value, 'valid': False, 'correct': False}
+            if self.fixed[idx]:
+                entry['reason'] = 'fixed'
+                results.append(entry)
+                continue
+
+            previous = grid[idx]
+            board.remove_number(row, col)
+            if not value:
+                entry['valid'] = True
+            elif board.place_number(row, col, value):
+                entry['valid'] = True
+                entry['correct'] = value == self.solution[idx]
+            else:
+                entry['reason'] = 'conflict'
+                if previous:
+                    board.place_number(row, col, previous)
+            results.append(entry)
+        return board, results
+
+    def is_complete(self, board):
+        return bytes(board.grid) == self.solution
+
+    def hint(self, board):
+        """다음에 채울 칸 추천 ({'row', 'col', 'value', 'reason'}, 다 풀었으면 None)
+
+        정답과 다른 숫자가 있으면 그 칸을 먼저 알려주고(reason 'incorrect'), 없으면 현재
+        보드에서 후보가 가장 적은 빈 칸의 정답을 알려준다(후보가 하나뿐이면 'single').
+        """
+        grid = board.grid
+        solution = self.solution
+        for idx in range(81):
+            if grid[idx] and grid[idx] != solution[idx]:
+                row, col = divmod(idx, 9)
+                return {'row': row, 'col': col, 'value': solution[idx], 'reason': 'incorrect'}
+
+        # 행, 열, 박스와 기물 영역에 쓰인 숫자 마스크로 빈 칸의 후보 수 계산
+        rows = [0] * 9
+        cols = [0] * 9
+        boxes = [0] * 9
+        for idx in range(81):
+            num = grid[idx]
+            if 1 <= num <= 9:
+                row, col = divmod(idx, 9)
+                bit = 1 << (num - 1)
+                rows[row] |= bit
+                cols[col] |= bit
+                boxes[row // 3 * 3 + col // 3] |= bit
+
+        masks = board.region_masks
+        best = None
+        for idx in range(81):
+            if grid[idx] != 0:
+                continue
+            row, col = divmod(idx, 9)
+            used = rows[row] | cols[col] | boxes[row // 3 * 3 + col // 3]
+            for region_id in board.region_index[idx]:
+                used |= masks[region_id]
+            count = 9 - POPCOUNT[used]
+            if best is None or count < best[0]:
+                best = (count, idx)
+                if count <= 1:
+                    break
+
+        if best is None:
+            return None
+        row, col = divmod(best[1], 9)
+        return {'row': row, 'col': col, 'value': solution[best[1]],
+                'reason': 'single' if best[0] == 1 else 'fewest_candidates'}
+
+
+class PlayStateCache:
+    """퍼즐 ID → PuzzlePlayState LRU 캐시 (자주 플레이되는 퍼즐의 상태를 메모리에 유지)
+
+    load(퍼즐 ID)는 저장된 퍼즐 데이터나 None을 반환해야 한다.
+    """
+
+    def __init__(self, load, max_size=4096):
+        self.load = load
+        self.max_size = max_size
+        self.states = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, puzzle_id):
+        """퍼즐의 풀이 상태 반환 (없는 퍼즐이면 None)"""
+        with self.lock:
+            state = self.states.get(puzzle_id)
+            if state is not None:
+                self.states.move_to_end(puzzle_id)
+                self.stats['hits'] += 1
+                return state
+            self.stats['misses'] += 1
+
+        data = self.load(puzzle_id)
+        if data is None:
+            return None
+        state = PuzzlePlayState.from_data(data)
+
+        with self.lock:
+            self.states[puzzle_id] = state
+            self.states.move_to_end(puzzle_id)
+            while len(self.states) > self.max_size:
+                self.states.popitem(last=False)
+                self.stats['evictions'] += 1
+        return state
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats, size=len(self.states))
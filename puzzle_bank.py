@@ -0,0 +1,261 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+
+from chessudoku import (ChessSudokuBoard, DIFFICULTY_LEVELS, normalize_piece_config,
+                        puzzle_content_id, validate_piece_config)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS puzzles (
+    puzzle_id TEXT PRIMARY KEY,
+    difficulty TEXT NOT NULL,
+    layout_hash TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    clues INTEGER NOT NULL,
+    puzzle BLOB NOT NULL,
+    solution BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS puzzles_by_slot ON puzzles (difficulty, layout_hash, slot);
+CREATE INDEX IF NOT EXISTS puzzles_by_clues ON puzzles (difficulty, layout_hash, clues, slot);
+CREATE TABLE IF NOT EXISTS bank_counts (
+    difficulty TEXT NOT NULL,
+    layout_hash TEXT NOT NULL,
+    pieces TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (difficulty, layout_hash)
+) WITHOUT ROWID;
+"""
+
+# 연결마다 DB 파일을 메모리 매핑할 최대 크기 (조회 시 read() 호출 없이 페이지를 읽음)
+MMAP_SIZE = 256 * 1024 * 1024
+
+
+def layout_hash(piece_config):
+    """기물 배치(순서와 표현 형식 무관)의 짧은 해시 (없으면 기본 배치)"""
+    layout = json.dumps(normalize_piece_config(piece_config), separators=(',', ':'))
+    return hashlib.sha1(layout.encode('ascii')).hexdigest()[:16]
+
+
+def removed_cells(puzzle, solution):
+    """퍼즐의 빈 칸과 정답으로 제거한 칸 목록 [(행, 열, 숫자), ...] 계산"""
+    return [(*divmod(idx, 9), solution.grid[idx])
+            for idx in range(81) if puzzle.grid[idx] == 0 and solution.grid[idx] <= 9]
+
+
+class PuzzleBank:
+    """미리 생성한 퍼즐을 담아 두는 로컬 SQLite 퍼즐 은행
+
+    퍼즐과 정답은 to_packed() 바이트열로 저장하고 (난이도, 기물 배치 해시, 힌트 수)로 색인한다.
+    (난이도, 배치)마다 퍼즐에 0부터 차례로 slot 번호를 매기고 개수를 bank_counts에 두므로,
+    무작위 추출은 전체를 훑지 않고 slot 하나를 색인으로 찾는 것으로 끝난다.
+
+    연결은 스레드마다 처음 사용할 때 열고, fork된 프로세스에서는 새로 연다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.pid = None
+
+    @property
+    def db(self):
+        """현재 스레드의 SQLite 연결 (처음 사용할 때 생성)"""
+        if self.pid != os.getpid():
+            # fork 전에 만든 연결은 자식 프로세스에서 쓰지 않음
+            self.local = threading.local()
+            self.pid = os.getpid()
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+            db.executescript(SCHEMA)
+            self.local.db = db
+        return db
+
+    def ready(self):
+        self.db.execute('SELECT 1 FROM bank_counts LIMIT 1').fetchall()
+        return True
+
+    def add_many(self, difficulty, piece_config, results):
+        """generate_puzzle 결과들을 한 트랜잭션으로 저장하고 새로 저장한 퍼즐 ID 목록 반환
+
+        ID는 결과의 seed로 만든 puzzle_content_id이므로 이미 있는 퍼즐은 다시 저장하지 않는다.
+        """
+        key = layout_hash(piece_config)
+        pieces = json.dumps(normalize_piece_config(piece_config))
+        db = self.db
+        ids = []
+        with db:
+            row = db.execute('SELECT count FROM bank_counts WHERE difficulty = ? AND layout_hash = ?',
+                             (difficulty, key)).fetchone()
+            slot = row[0] if row else 0
+            for result in results:
+                if 'seed' in result:
+                    puzzle_id = puzzle_content_id(result['seed'], difficulty, piece_config,
+                                                  result.get('variant'))
+                else:
+                    puzzle_id = uuid.uuid4().hex
+                clues = sum(1 for code in result['puzzle'].grid if 1 <= code <= 9)
+                inserted = db.execute('INSERT OR IGNORE INTO puzzles VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                      (puzzle_id, difficulty, key, slot, clues,
+                                       result['puzzle'].to_packed(),
+                                       result['solution'].to_packed())).rowcount
+                if inserted:
+                    ids.append(puzzle_id)
+                    slot += 1
+            db.execute('INSERT OR REPLACE INTO bank_counts VALUES (?, ?, ?, ?)',
+                       (difficulty, key, pieces, slot))
+        return ids
+
+    def count(self, difficulty, piece_config=None):
+        """(난이도, 기물 배치)로 저장된 퍼즐 수"""
+        row = self.db.execute('SELECT count FROM bank_counts WHERE difficulty = ? AND layout_hash = ?',
+                              (difficulty, layout_hash(piece_config))).fetchone()
+        return row[0] if row else 0
+
+    def _load(self, row):
+        puzzle_id, difficulty, puzzle, solution = row
+        puzzle = ChessSudokuBoard.from_packed(puzzle)
+        solution = ChessSudokuBoard.from_packed(solution)
+        return {
+            'puzzle_id': puzzle_id,
+            'difficulty': difficulty,
+            'puzzle': puzzle,
+            'solution': solution,
+            'removed_cells': removed_cells(puzzle, solution),
+        }
+
+    def sample(self, difficulty, piece_config=None, clues=None, rng=random):
+        """(난이도, 기물 배치)의 퍼즐 하나를 무작위로 꺼내 반환 (없으면 None)
+
+        결과는 generate_puzzle 결과에 'puzzle_id'와 'difficulty'를 더한 딕셔너리이다.
+        clues를 주면 힌트 수가 같은 퍼즐 중에서 고르며, 무작위 slot 이후의 첫 퍼즐을
+        색인으로 찾으므로 slot 간격에 따라 약간 치우칠 수 있다.
+        """
+        total = self.count(difficulty, piece_config)
+        if not total:
+            return None
+        key = layout_hash(piece_config)
+        slot = rng.randrange(total)
+        db = self.db
+        if clues is None:
+            row = db.execute('SELECT puzzle_id, difficulty, puzzle, solution FROM puzzles '
+                             'WHERE difficulty = ? AND layout_hash = ? AND slot = ?',
+                             (difficulty, key, slot)).fetchone()
+        else:
+            query = ('SELECT puzzle_id, difficulty, puzzle, solution FROM puzzles '
+                     'WHERE difficulty = ? AND layout_hash = ? AND clues = ? AND slot >= ? '
+                     'ORDER BY slot LIMIT 1')
+            row = db.execute(query, (difficulty, key, clues, slot)).fetchone() or \
+                db.execute(query, (difficulty, key, clues, 0)).fetchone()
+        return self._load(row) if row else None
+
+    def get(self, puzzle_id):
+        """퍼즐 ID로 저장된 퍼즐 조회 (없으면 None, 결과 형식은 sample과 같음)"""
+        row = self.db.execute('SELECT puzzle_id, difficulty, puzzle, solution FROM puzzles '
+                              'WHERE puzzle_id = ?', (puzzle_id,)).fetchone()
+        return self._load(row) if row else None
+
+    def snapshot(self):
+        """(난이도, 기물 배치)별 저장된 퍼즐 수"""
+        rows = self.db.execute('SELECT difficulty, layout_hash, pieces, count FROM bank_counts '
+                               'ORDER BY difficulty, layout_hash').fetchall()
+        return [{'difficulty': difficulty, 'layout_hash': key, 'pieces': json.loads(pieces),
+                 'count': count} for difficulty, key, pieces, count in rows]
+
+    def close(self):
+        db = getattr(self.local, 'db', None)
+        if db is not None and self.pid == os.getpid():
+            db.close()
+        self.local = threading.local()
+
+
+class BankDocumentStore:
+    """퍼즐 은행을 저장소의 조회 인터페이스로 감싼 읽기 전용 어댑터
+
+    CachedPuzzleStore로 감싸 저장소와 같이 문서와 ETag를 캐시하는 데 사용한다.
+    to_document(result)로 은행 결과를 저장소 문서 형식으로 바꾼다.
+    """
+
+    # 은행은 fill로만 채우므로 write_batch는 없음
+    max_batch_size = 0
+
+    def __init__(self, bank, to_document):
+        self.bank = bank
+        self.to_document = to_document
+
+    def ready(self):
+        return self.bank.ready()
+
+    def get(self, puzzle_id):
+        result = self.bank.get(puzzle_id)
+        return self.to_document(result) if result is not None else None
+
+
+def fill(bank, difficulty, piece_config, count, workers=None, batch_size=100, log=sys.stderr):
+    """generate_puzzle로 퍼즐 count개를 생성해 은행에 저장 (워커 프로세스 workers개 사용)"""
+    from generation_service import GenerationService
+
+    validate_piece_config(piece_config)
+    service = GenerationService(max_workers=workers)
+    started = time.perf_counter()
+    stored = 0
+    try:
+        # 진행 중인 작업은 워커 수의 두 배까지만 두고, 요청한 순서대로 batch_size개씩 저장
+        pending = deque(service.submit(difficulty, piece_config)
+                        for _ in range(min(count, service.max_workers * 2)))
+        submitted = len(pending)
+        batch = []
+        while pending:
+            result = pending.popleft().result()
+            if submitted < count:
+                pending.append(service.submit(difficulty, piece_config))
+                submitted += 1
+            batch.append(result)
+            if len(batch) >= batch_size or not pending:
+                bank.add_many(difficulty, piece_config, batch)
+                stored += len(batch)
+                batch = []
+                print(f"{difficulty}: {stored}/{count} ({time.perf_counter() - started:.1f}s)", file=log)
+    finally:
+        service.shutdown()
+    return stored
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 퍼즐 은행(SQLite) 채우기와 조회")
+    parser.add_argument('--db', default='puzzle_bank.sqlite3', help="퍼즐 은행 파일 경로")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    fill_parser = commands.add_parser('fill', help="퍼즐을 생성해 은행에 저장")
+    fill_parser.add_argument('--difficulty', nargs='+', choices=list(DIFFICULTY_LEVELS),
+                             default=list(DIFFICULTY_LEVELS))
+    fill_parser.add_argument('--count', type=int, default=100, help="난이도별 생성할 퍼즐 수")
+    fill_parser.add_argument('--pieces', type=json.loads, default=None,
+                             help='기물 배치 JSON (예: \'[["knight", 0, 2], ["king", 4, 4]]\', 없으면 기본 배치)')
+    fill_parser.add_argument('--workers', type=int, default=None, help="생성 워커 프로세스 수")
+
+    commands.add_parser('stats', help="(난이도, 기물 배치)별 저장된 퍼즐 수 출력 (JSON)")
+    args = parser.parse_args(argv)
+
+    bank = PuzzleBank(args.db)
+    try:
+        if args.command == 'fill':
+            for difficulty in args.difficulty:
+                fill(bank, difficulty, args.pieces, args.count, workers=args.workers)
+        print(json.dumps(bank.snapshot(), indent=2))
+    finally:
+        bank.close()
+
+
+if __name__ == '__main__':
+    main()
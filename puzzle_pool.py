@@ -0,0 +1,196 @@
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+
+from chessudoku import generate_puzzle, normalize_difficulty, normalize_piece_config
+
+
+def pool_key(difficulty, piece_config):
+    """(난이도, 정규화된 기물 배치) 풀 키 생성"""
+    return normalize_difficulty(difficulty), normalize_piece_config(piece_config)
+
+
+class PuzzlePool:
+    """(난이도, 기물 배치)별로 미리 생성한 퍼즐을 보관하고 백그라운드 스레드로 채우는 풀
+
+    개수가 low_watermark 아래로 내려가면 refill을 예약하고, 워커는 high_watermark까지 채운다.
+    warm()으로 등록한 키와 min_demand번 이상 요청된 키만 채우므로, 한 번만 요청된 사용자 지정
+    배치 때문에 백그라운드 생성이 돌지는 않는다. 요청된 키는 max_keys개까지 기억하고, 넘으면
+    warm()으로 등록하지 않았고 refill 중이 아닌 키 중 가장 오래 쓰이지 않은 키를 지운다.
+    키마다 마지막으로 내준 퍼즐은 변형 퍼즐을 만들 원본(template)으로 남겨 둔다.
+    """
+
+    def __init__(self, generate=generate_puzzle, low_watermark=2, high_watermark=8,
+                 workers=1, max_keys=64, min_demand=2):
+        self.generate = generate
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.max_keys = max_keys
+        self.min_demand = min_demand
+
+        self.lock = threading.Lock()
+        self.refill_needed = threading.Condition(self.lock)
+        self.puzzles = OrderedDict()  # 키 → 생성된 퍼즐 deque (가장 오래 쓰이지 않은 키가 앞)
+        self.warmed = set()   # warm()으로 등록한 키 (지우지 않음)
+        self.stats = {}       # 키 → 통계 딕셔너리
+        self.templates = {}   # 키 → 마지막으로 내준 퍼즐
+        self.pending = deque()  # refill 대기 중인 키
+        self.scheduled = set()
+        self.closed = False
+
+        self.workers = [
+            threading.Thread(target=self._refill_worker, name=f'puzzle-pool-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def _evict(self):
+        """가장 오래 쓰이지 않은 키 하나를 지움 (lock을 잡은 상태에서 호출, 지울 키가 없으면 False)"""
+        for key in self.puzzles:
+            if key not in self.warmed and key not in self.scheduled:
+                del self.puzzles[key]
+                del self.stats[key]
+                self.templates.pop(key, None)
+                return True
+        return False
+
+    def _track(self, key):
+        """키를 풀에 등록하거나 최근 사용으로 표시 (lock을 잡은 상태에서 호출, 자리가 없으면 False)"""
+        if key in self.puzzles:
+            self.puzzles.move_to_end(key)
+            return True
+        if len(self.puzzles) >= self.max_keys and not self._evict():
+            return False
+        self.puzzles[key] = deque()
+        self.stats[key] = {
+            'hits': 0,
+            'misses': 0,
+            'refills': 0,
+            'refill_seconds_total': 0.0,
+            'refill_seconds_last': 0.0,
+            'errors': 0,
+        }
+        return True
+
+    def _schedule(self, key):
+        """키의 refill을 예약 (lock을 잡은 상태에서 호출, 미리 채울 키가 아니면 무시)"""
+        if key in self.scheduled or len(self.puzzles[key]) >= self.low_watermark:
+            return
+        stats = self.stats[key]
+        if key not in self.warmed and stats['hits'] + stats['misses'] < self.min_demand:
+            return
+        self.scheduled.add(key)
+        self.pending.append(key)
+        self.refill_needed.notify()
+
+    def warm(self, difficulty, piece_config=None):
+        """키를 등록하고 high_watermark까지 미리 채우도록 예약"""
+        key = pool_key(difficulty, piece_config)
+        with self.lock:
+            if self._track(key):
+                self.warmed.add(key)
+                self._schedule(key)
+        return key
+
+    def try_get(self, difficulty, piece_config=None):
+        """풀에서 퍼즐을 꺼냄 (비어 있으면 생성하지 않고 None, refill은 예약)"""
+        key = pool_key(difficulty, piece_config)
+        with self.lock:
+            tracked = self._track(key)
+            queue = self.puzzles.get(key)
+            result = queue.popleft() if queue else None
+            if tracked:
+                self.stats[key]['hits' if result is not None else 'misses'] += 1
+                self._schedule(key)
+                if result is not None:
+                    self.templates[key] = result
+        return result
+
+    def generate_now(self, difficulty, piece_config=None):
+        """호출한 스레드에서 퍼즐을 바로 생성 (try_get이 None일 때 사용, 결과는 변형 원본으로 남김)"""
+        key = pool_key(difficulty, piece_config)
+        result = self.generate(difficulty=key[0], piece_config=list(key[1]))
+        with self.lock:
+            # 생성하는 동안 지워진 키는 다시 만들지 않음
+            if key in self.puzzles:
+                self.templates[key] = result
+        return result
+
+    def get(self, difficulty, piece_config=None):
+        """풀에서 퍼즐을 꺼냄 (비어 있으면 호출한 스레드에서 바로 생성)"""
+        result = self.try_get(difficulty, piece_config)
+        if result is None:
+            result = self.generate_now(difficulty, piece_config)
+        return result
+
+    def template(self, difficulty, piece_config=None):
+        """키의 변형 원본 퍼즐 반환 (아직 내준 퍼즐이 없으면 None)"""
+        key = pool_key(difficulty, piece_config)
+        with self.lock:
+            return self.templates.get(key)
+
+    def _refill_worker(self):
+        """예약된 키를 high_watermark까지 채우는 백그라운드 루프"""
+        while True:
+            with self.lock:
+                while not self.pending and not self.closed:
+                    self.refill_needed.wait()
+                if self.closed:
+                    return
+                key = self.pending.popleft()
+
+            try:
+                self._refill(key)
+            finally:
+                with self.lock:
+                    self.scheduled.discard(key)
+
+    def _refill(self, key):
+        difficulty, pieces = key
+        while True:
+            with self.lock:
+                if self.closed or len(self.puzzles[key]) >= self.high_watermark:
+                    return
+
+            start = time.perf_counter()
+            try:
+                result = self.generate(difficulty=difficulty, piece_config=list(pieces))
+            except Exception:
+                print(traceback.format_exc())
+                with self.lock:
+                    self.stats[key]['errors'] += 1
+                return
+            elapsed = time.perf_counter() - start
+
+            with self.lock:
+                self.puzzles[key].append(result)
+                stats = self.stats[key]
+                stats['refills'] += 1
+                stats['refill_seconds_total'] += elapsed
+                stats['refill_seconds_last'] = elapsed
+
+    def snapshot(self):
+        """키별 통계 (hits, misses, depth, refill 지연 시간) 반환"""
+        with self.lock:
+            result = []
+            for key, stats in self.stats.items():
+                difficulty, pieces = key
+                entry = dict(stats)
+                entry['difficulty'] = difficulty
+                entry['pieces'] = [list(piece) for piece in pieces]
+                entry['depth'] = len(self.puzzles[key])
+                entry['refill_seconds_avg'] = (
+                    stats['refill_seconds_total'] / stats['refills'] if stats['refills'] else 0.0
+                )
+                result.append(entry)
+            return result
+
+    def close(self):
+        """백그라운드 워커 종료"""
+        with self.lock:
+            self.closed = True
+            self.refill_needed.notify_all()
+        for worker in self.workers:
+            worker.join()
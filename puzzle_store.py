@@ -0,0 +1,388 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+
+from chessudoku import ChessSudokuBoard
+
+
+class WriteQueueFull(Exception):
+    """쓰기 대기열이 가득 차서 더 받을 수 없음"""
+
+
+# 저장소 문서 형식 버전 (퍼즐 문서를 Firestore가 받는 형식으로 바꾼 것)
+STORAGE_FORMAT = 1
+
+
+def to_storage_document(data):
+    """퍼즐 문서({'puzzle_data': 응답, 'difficulty'})를 저장소에 쓸 문서로 변환
+
+    Firestore는 배열 안의 배열을 저장하지 못하므로 to_dict의 9x9 board와 piece_positions 대신
+    보드를 to_compact 문자열로, removed_cells를 칸마다 '행 열 숫자' 3글자를 이은 문자열로 저장한다.
+    추적 데이터는 보드에서 다시 계산할 수 있으므로 저장하지 않는다.
+    """
+    payload = data['puzzle_data']
+    puzzle_data = payload['puzzle_data']
+    doc = {
+        'storage_format': STORAGE_FORMAT,
+        'puzzle_id': payload['puzzle_id'],
+        'difficulty': data['difficulty'],
+        'puzzle': ChessSudokuBoard.from_dict(puzzle_data['puzzle']).to_compact(),
+        'solution': ChessSudokuBoard.from_dict(puzzle_data['solution']).to_compact(),
+        'removed_cells': ''.join(f"{row}{col}{num}" for row, col, num in puzzle_data['removed_cells']),
+    }
+    if 'seed' in payload:
+        doc['seed'] = payload['seed']
+    return doc
+
+
+def from_storage_document(doc):
+    """to_storage_document로 저장한 문서를 퍼즐 문서로 복원 (이전 형식의 문서는 그대로 반환)"""
+    if doc is None or 'storage_format' not in doc:
+        return doc
+    cells = doc['removed_cells']
+    payload = {
+        'puzzle_data': {
+            'puzzle': ChessSudokuBoard.from_compact(doc['puzzle']).to_dict(),
+            'solution': ChessSudokuBoard.from_compact(doc['solution']).to_dict(),
+            'removed_cells': [[int(cells[k]), int(cells[k + 1]), int(cells[k + 2])]
+                              for k in range(0, len(cells), 3)],
+        },
+        'puzzle_id': doc['puzzle_id'],
+        'difficulty': doc['difficulty'],
+    }
+    if 'seed' in doc:
+        payload['seed'] = doc['seed']
+    return {'puzzle_data': payload, 'difficulty': doc['difficulty']}
+
+
+def check_storage_value(value, in_array=False):
+    """Firestore가 저장하지 못하는 값(배열 안의 배열)이 있으면 ValueError"""
+    if isinstance(value, dict):
+        for item in value.values():
+            check_storage_value(item)
+    elif isinstance(value, (list, tuple)):
+        if in_array:
+            raise ValueError("Cannot convert an array value in an array value")
+        for item in value:
+            check_storage_value(item, in_array=True)
+
+
+def firestore_client(credentials_path=None):
+    """호출할 때마다 새 Firestore 클라이언트 생성
+
+    firebase_admin.firestore.client()는 앱마다 클라이언트 하나를 캐시하므로 fork된 프로세스에서도
+    부모의 gRPC 클라이언트를 돌려준다. 그래서 google.cloud.firestore.Client를 직접 만든다.
+    credentials_path(서비스 계정 키 파일)가 없으면 Application Default Credentials를 사용한다.
+    """
+    from google.cloud import firestore
+    from google.oauth2 import service_account
+
+    if credentials_path:
+        cred = service_account.Credentials.from_service_account_file(credentials_path)
+        return firestore.Client(project=cred.project_id, credentials=cred)
+    return firestore.Client()
+
+
+class FirestorePuzzleStore:
+    """Firestore 컬렉션에 퍼즐을 저장하는 저장소
+
+    db를 주지 않으면 처음 사용할 때 client_factory()로 클라이언트를 만든다. gRPC 클라이언트는
+    fork 후에 쓸 수 없으므로 다른 프로세스(fork된 워커)에서 사용하면 client_factory()를 다시
+    호출한다 (그래서 client_factory는 캐시된 클라이언트가 아닌 새 클라이언트를 만들어야 한다).
+    """
+
+    # Firestore batch 한 번에 쓸 수 있는 최대 문서 수
+    max_batch_size = 500
+
+    def __init__(self, db=None, collection='puzzles', client_factory=firestore_client):
+        self.client_factory = client_factory
+        self.collection = collection
+        self._db = db
+        self._pid = os.getpid()
+        self.lock = threading.Lock()
+
+    @property
+    def db(self):
+        pid = os.getpid()
+        if self._db is None or self._pid != pid:
+            with self.lock:
+                if self._db is None or self._pid != pid:
+                    self._db = self.client_factory()
+                    self._pid = pid
+        return self._db
+
+    def ready(self):
+        """클라이언트를 만들 수 있는지 확인 (만들지 못하면 예외)"""
+        return self.db is not None
+
+    def new_id(self):
+        """네트워크 요청 없이 새 문서 ID 생성"""
+        return self.db.collection(self.collection).document().id
+
+    def write_batch(self, items):
+        """(퍼즐 ID, 데이터) 목록을 to_storage_document로 바꿔 한 번의 batch commit으로 저장"""
+        from google.cloud import firestore
+
+        batch = self.db.batch()
+        collection = self.db.collection(self.collection)
+        for puzzle_id, data in items:
+            batch.set(collection.document(puzzle_id),
+                      dict(to_storage_document(data), created_at=firestore.SERVER_TIMESTAMP))
+        batch.commit()
+
+    def get(self, puzzle_id):
+        """저장된 퍼즐 조회 (없으면 None)"""
+        doc = self.db.collection(self.collection).document(puzzle_id).get()
+        return from_storage_document(doc.to_dict()) if doc.exists else None
+
+
+class InMemoryPuzzleStore:
+    """테스트와 벤치마크용 메모리 저장소 (FirestorePuzzleStore와 같은 인터페이스)
+
+    FirestorePuzzleStore와 같은 형식으로 저장하고, Firestore가 거부하는 문서(배열 안의 배열)는
+    ValueError로 거부한다.
+    """
+
+    max_batch_size = 500
+
+    def __init__(self, write_delay=0.0):
+        # write_delay로 batch commit의 네트워크 지연을 흉내낼 수 있음
+        self.write_delay = write_delay
+        self.documents = {}
+        self.batches = 0
+        self.lock = threading.Lock()
+
+    def new_id(self):
+        return uuid.uuid4().hex
+
+    def ready(self):
+        return True
+
+    def write_batch(self, items):
+        docs = [(puzzle_id, dict(to_storage_document(data), created_at=time.time()))
+                for puzzle_id, data in items]
+        for _, doc in docs:
+            check_storage_value(doc)
+        if self.write_delay:
+            time.sleep(self.write_delay)
+        with self.lock:
+            self.documents.update(docs)
+            self.batches += 1
+
+    def get(self, puzzle_id):
+        with self.lock:
+            doc = self.documents.get(puzzle_id)
+        return from_storage_document(doc)
+
+
+# 저장소가 문서에 덧붙이는 필드 (응답 본문과 ETag에는 넣지 않음)
+STORAGE_FIELDS = ('created_at',)
+
+
+def served_document(data):
+    """저장된 문서에서 저장소 필드를 뺀 응답용 문서 (쓰기 전후로 같은 내용)"""
+    if data is None or not any(field in data for field in STORAGE_FIELDS):
+        return data
+    return {key: value for key, value in data.items() if key not in STORAGE_FIELDS}
+
+
+def compute_etag(data):
+    """퍼즐 데이터 내용으로 strong ETag 값 계산 (served_document로 정리한 문서에 사용)"""
+    body = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()[:32]
+
+
+class CachedPuzzleStore:
+    """저장소 앞에 두는 LRU/TTL 읽기 캐시 (같은 인터페이스로 감싸서 사용)
+
+    저장된 퍼즐은 바뀌지 않으므로 조회 결과를 ETag와 함께 max_size개까지 ttl초 동안
+    보관한다. 조회 결과는 served_document로 created_at 같은 저장소 필드를 뺀 문서이다. 없는 퍼즐도 negative_ttl초 동안 기억하며, write_batch로 저장된 ID는
+    negative 항목에서 지운다.
+    """
+
+    def __init__(self, store, max_size=1024, ttl=3600.0, negative_ttl=30.0):
+        self.store = store
+        self.max_batch_size = store.max_batch_size
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self.entries = OrderedDict()  # 퍼즐 ID → (데이터, ETag, 만료 시각), 없는 퍼즐은 데이터가 None
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'negative_hits': 0, 'evictions': 0}
+
+    def new_id(self):
+        return self.store.new_id()
+
+    def ready(self):
+        return self.store.ready()
+
+    def write_batch(self, items):
+        self.store.write_batch(items)
+        with self.lock:
+            for puzzle_id, _ in items:
+                entry = self.entries.get(puzzle_id)
+                if entry is not None and entry[0] is None:
+                    del self.entries[puzzle_id]
+
+    def get_entry(self, puzzle_id):
+        """(데이터, ETag) 반환 (없는 퍼즐이면 (None, None))"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(puzzle_id)
+            if entry is not None and entry[2] > now:
+                self.entries.move_to_end(puzzle_id)
+                self.stats['hits' if entry[0] is not None else 'negative_hits'] += 1
+                return entry[0], entry[1]
+            self.stats['misses'] += 1
+
+        data = served_document(self.store.get(puzzle_id))
+        if data is None:
+            entry = (None, None, now + self.negative_ttl)
+        else:
+            entry = (data, compute_etag(data), now + self.ttl)
+
+        with self.lock:
+            self.entries[puzzle_id] = entry
+            self.entries.move_to_end(puzzle_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+        return entry[0], entry[1]
+
+    def get(self, puzzle_id):
+        return self.get_entry(puzzle_id)[0]
+
+    def snapshot(self):
+        """hits, misses, negative_hits, evictions와 현재 캐시 크기 반환"""
+        with self.lock:
+            return dict(self.stats, size=len(self.entries))
+
+
+class WriteBehindQueue:
+    """퍼즐 ID를 바로 돌려주고, 백그라운드 스레드가 모아서 batch로 저장하는 쓰기 대기열
+
+    대기열은 max_size개까지만 받으며(넘으면 WriteQueueFull), 실패한 batch는
+    max_retries번까지 다시 시도한다. 저장되기 전의 퍼즐도 get()으로 조회할 수 있다.
+    저장 스레드는 처음 put()할 때 시작하므로 fork 전에 만들어 두어도 된다.
+    """
+
+    def __init__(self, store, max_size=1000, batch_size=100, flush_interval=0.5,
+                 max_retries=3, retry_backoff=0.5):
+        self.store = store
+        self.batch_size = min(batch_size, store.max_batch_size)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self.queue = queue.Queue(maxsize=max_size)
+        self.pending = {}   # 아직 저장되지 않은 퍼즐 ID → 데이터
+        self.lock = threading.Lock()
+        self.stats = {'queued': 0, 'written': 0, 'batches': 0, 'retries': 0, 'failed': 0}
+        self.closed = False
+        self.worker = None
+        self.worker_pid = None
+
+    def _start_worker(self):
+        """이 프로세스에서 저장 스레드가 돌고 있지 않으면 시작"""
+        pid = os.getpid()
+        if self.worker is not None and self.worker_pid == pid:
+            return
+        with self.lock:
+            if self.worker is None or self.worker_pid != pid:
+                self.worker = threading.Thread(target=self._write_worker,
+                                               name='puzzle-write-behind', daemon=True)
+                self.worker_pid = pid
+                self.worker.start()
+
+    def put(self, data, puzzle_id=None):
+        """데이터를 저장 대기열에 넣고 퍼즐 ID 반환 (ID가 없으면 저장소에서 새로 발급)"""
+        if self.closed:
+            raise WriteQueueFull("Write queue is closed")
+        self._start_worker()
+
+        if puzzle_id is None:
+            puzzle_id = self.store.new_id()
+        with self.lock:
+            self.pending[puzzle_id] = data
+        try:
+            self.queue.put_nowait((puzzle_id, data))
+        except queue.Full:
+            with self.lock:
+                del self.pending[puzzle_id]
+            raise WriteQueueFull("Write queue is full")
+
+        with self.lock:
+            self.stats['queued'] += 1
+        return puzzle_id
+
+    def get(self, puzzle_id):
+        """아직 저장되지 않은 퍼즐 조회 (없으면 None)"""
+        with self.lock:
+            return self.pending.get(puzzle_id)
+
+    def _write_worker(self):
+        """flush_interval마다 또는 batch_size개가 모이면 저장"""
+        while True:
+            try:
+                items = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                if self.closed:
+                    return
+                continue
+
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._write(items)
+            for _ in items:
+                self.queue.task_done()
+
+    def _write(self, items):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.store.write_batch(items)
+                break
+            except Exception:
+                print(traceback.format_exc())
+                if attempt == self.max_retries:
+                    with self.lock:
+                        self.stats['failed'] += len(items)
+                        for puzzle_id, _ in items:
+                            self.pending.pop(puzzle_id, None)
+                    return
+                with self.lock:
+                    self.stats['retries'] += 1
+                time.sleep(self.retry_backoff * (2 ** attempt))
+
+        with self.lock:
+            self.stats['written'] += len(items)
+            self.stats['batches'] += 1
+            for puzzle_id, _ in items:
+                self.pending.pop(puzzle_id, None)
+
+    def flush(self):
+        """대기열에 있는 퍼즐이 모두 저장될 때까지 기다림"""
+        self.queue.join()
+
+    def snapshot(self):
+        """대기열 길이와 저장 통계 반환"""
+        with self.lock:
+            return dict(self.stats, depth=self.queue.qsize())
+
+    def close(self):
+        """새 퍼즐을 더 받지 않고 남은 퍼즐을 모두 저장한 뒤 종료"""
+        self.closed = True
+        if self.worker is None or self.worker_pid != os.getpid():
+            return
+        self.flush()
+        self.worker.join()
@@ -0,0 +1,111 @@
+import random
+from array import array
+
+from chessudoku import ChessSudokuBoard, MARK_CODE, normalize_piece_config
+
+# 보드 대칭 변환 (D4): (행, 열) → 변환된 (행, 열)
+# 행/열/박스는 행/열/박스로, 나이트와 킹 이동은 같은 모양으로, 대각선은 대각선으로 옮겨지므로
+# 기물 배치를 함께 옮기면 모든 규칙이 그대로 유지된다.
+SYMMETRIES = {
+    'identity': lambda r, c: (r, c),
+    'rot90': lambda r, c: (c, 8 - r),
+    'rot180': lambda r, c: (8 - r, 8 - c),
+    'rot270': lambda r, c: (8 - c, r),
+    'flip_horizontal': lambda r, c: (r, 8 - c),
+    'flip_vertical': lambda r, c: (8 - r, c),
+    'transpose': lambda r, c: (c, r),
+    'anti_transpose': lambda r, c: (8 - c, 8 - r),
+}
+
+# 대칭 변환별 칸 번호 → 옮겨진 칸 번호
+CELL_MAPS = {
+    name: tuple(r * 9 + c for r, c in (move(*divmod(idx, 9)) for idx in range(81)))
+    for name, move in SYMMETRIES.items()
+}
+
+IDENTITY_LABELS = tuple(range(1, 10))
+
+
+def relabel_table(labels):
+    """칸 코드 변환표 (숫자 d → labels[d - 1], 빈 칸과 기물은 그대로)"""
+    if sorted(labels) != list(IDENTITY_LABELS):
+        raise ValueError(f"labels must be a permutation of 1-9: {labels}")
+    return bytes([0]) + bytes(labels) + bytes(range(10, 256))
+
+
+def transform_board(board, symmetry='identity', labels=IDENTITY_LABELS):
+    """보드를 대칭 변환하고 숫자를 바꿔 새 보드 반환 (탐색 없이 O(81))
+
+    labels[d - 1]은 숫자 d의 새 숫자이다. 규칙은 모두 "같은 영역에 같은 숫자 금지"이므로
+    원래 보드가 규칙에 맞으면 변환된 보드도 맞고, 퍼즐의 해 개수도 그대로이다.
+    """
+    cell_map = CELL_MAPS[symmetry]
+    move = SYMMETRIES[symmetry]
+    codes = board.grid.translate(relabel_table(labels))
+
+    result = ChessSudokuBoard()
+    grid = result.grid
+    for idx in range(81):
+        # 'N' 표시는 기물 배치로부터 다시 만들 수 있으므로 옮기지 않음
+        if codes[idx] != MARK_CODE:
+            grid[cell_map[idx]] = codes[idx]
+    result.piece_positions = {
+        piece: [move(row, col) for row, col in positions]
+        for piece, positions in board.piece_positions.items()
+    }
+    result.build_region_index()
+
+    # 기물 영역마다 놓인 숫자를 새 칸 배치에서 다시 계산
+    masks = array('H', bytes(2 * len(result.region_keys)))
+    for idx in range(81):
+        num = grid[idx]
+        if 1 <= num <= 9:
+            bit = 1 << (num - 1)
+            for region_id in result.region_index[idx]:
+                masks[region_id] |= bit
+    result.region_masks = masks
+    return result
+
+
+def transform_puzzle(result, symmetry='identity', labels=IDENTITY_LABELS):
+    """generate_puzzle 결과(퍼즐, 정답, 제거한 칸)를 같은 변환으로 옮긴 새 결과 반환
+
+    원래 결과의 'seed'와 적용한 변환('variant')을 함께 담아 puzzle_content_id로 ID를 만들 수 있다.
+    """
+    move = SYMMETRIES[symmetry]
+    removed = []
+    for row, col, value in result['removed_cells']:
+        row, col = move(row, col)
+        removed.append((row, col, labels[value - 1]))
+
+    transformed = {
+        'puzzle': transform_board(result['puzzle'], symmetry, labels),
+        'solution': transform_board(result['solution'], symmetry, labels),
+        'removed_cells': removed,
+        'variant': {'symmetry': symmetry, 'labels': list(labels)}
+    }
+    if 'seed' in result:
+        transformed['seed'] = result['seed']
+    return transformed
+
+
+def layout_symmetries(piece_config):
+    """기물 배치를 그대로 두는 대칭 변환 이름 목록 (항상 'identity' 포함)"""
+    layout = normalize_piece_config(piece_config)
+    names = []
+    for name, move in SYMMETRIES.items():
+        moved = [(piece, *move(row, col)) for piece, row, col in layout]
+        if normalize_piece_config(moved) == layout:
+            names.append(name)
+    return names
+
+
+def random_variant(result, symmetries=None, rng=random):
+    """무작위 숫자 치환과 대칭 변환(symmetries 중 하나)으로 새 퍼즐 결과 생성
+
+    symmetries를 주지 않으면 숫자만 바꾼다 (기물 배치가 그대로 유지됨).
+    """
+    labels = list(IDENTITY_LABELS)
+    rng.shuffle(labels)
+    symmetry = rng.choice(symmetries) if symmetries else 'identity'
+    return transform_puzzle(result, symmetry, labels)
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from benchmark import PIECE_CATALOGUE
+from chessudoku import PACKED_VERSION, ChessSudokuBoard, generate_puzzle
+
+LAYOUTS = sorted(PIECE_CATALOGUE)
+
+
+def as_json(data):
+    return json.loads(json.dumps(data))
+
+
+@pytest.fixture(scope='module')
+def boards():
+    """배치별 생성 퍼즐과 정답 보드"""
+    boards = []
+    for name in LAYOUTS:
+        result = generate_puzzle(difficulty='medium', piece_config=PIECE_CATALOGUE[name], seed=1)
+        boards += [result['puzzle'], result['solution']]
+    return boards
+
+
+@pytest.mark.parametrize('encode, decode', [
+    (ChessSudokuBoard.to_compact, ChessSudokuBoard.from_compact),
+    (ChessSudokuBoard.to_packed, ChessSudokuBoard.from_packed),
+], ids=['compact', 'packed'])
+def test_round_trip_keeps_board_and_tracking_data(boards, encode, decode):
+    for board in boards:
+        restored = decode(encode(board))
+        assert restored.grid == board.grid
+        assert as_json(restored.to_dict()) == as_json(board.to_dict())
+
+
+def test_packed_size(boards):
+    for board in boards:
+        pieces = sum(len(positions) for positions in board.piece_positions.values())
+        assert len(board.to_packed()) == 43 + 2 * pieces
+
+
+def test_compact_format():
+    board = ChessSudokuBoard()
+    board.place_piece('knight', 0, 2)
+    board.place_number(0, 0, 5)
+    assert board.to_compact() == {'grid': '5' + '0' * 80, 'pieces': 'N02'}
+
+
+def compact_board(grid='0' * 81, pieces=''):
+    return {'grid': grid, 'pieces': pieces}
+
+
+def packed_board(digits=(), pieces=()):
+    """칸 번호 → 숫자 딕셔너리와 (기물 코드, 칸 번호) 목록으로 만든 packed 바이트열"""
+    cells = [dict(digits).get(idx, 0) for idx in range(82)]
+    packed = bytearray([PACKED_VERSION])
+    packed += bytes((cells[i] << 4) | cells[i + 1] for i in range(0, 82, 2))
+    packed.append(len(pieces))
+    for code, idx in pieces:
+        packed += bytes((code, idx))
+    return bytes(packed)
+
+
+@pytest.mark.parametrize('data', [
+    compact_board(grid='0' * 80),
+    compact_board(pieces='N0'),
+    compact_board(pieces='X00'),
+    compact_board(pieces='K99'),
+    compact_board(pieces='K00N00'),
+    compact_board(grid='55' + '0' * 79),
+    compact_board(grid='5' + '0' * 80, pieces='N00'),
+], ids=['length', 'pieces-length', 'piece-code', 'piece-position', 'same-cell',
+        'conflicting-digit', 'digit-on-piece'])
+def test_from_compact_rejects(data):
+    with pytest.raises(ValueError):
+        ChessSudokuBoard.from_compact(data)
+
+
+@pytest.mark.parametrize('data', [
+    packed_board()[:-1],
+    packed_board(pieces=[(2, 2)])[:-1],
+    bytes([PACKED_VERSION + 1]) + packed_board()[1:],
+    packed_board(pieces=[(7, 0)]),
+    packed_board(pieces=[(0, 81)]),
+    packed_board(digits={0: 5, 1: 5}),
+    packed_board(digits={0: 5, 12: 5}, pieces=[(2, 19)]),
+], ids=['length', 'pieces-length', 'version', 'piece-code', 'piece-position',
+        'conflicting-digit', 'knight-conflict'])
+def test_from_packed_rejects(data):
+    with pytest.raises(ValueError):
+        ChessSudokuBoard.from_packed(data)
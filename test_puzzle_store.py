@@ -0,0 +1,150 @@
+import json
+
+import pytest
+
+from chessudoku import generate_puzzle
+from puzzle_store import CachedPuzzleStore, InMemoryPuzzleStore, WriteBehindQueue
+
+
+def puzzle_document(seed):
+    """서버가 쓰기 대기열에 넣는 것과 같은 형식의 퍼즐 문서"""
+    result = generate_puzzle(difficulty='easy', seed=seed)
+    payload = {
+        'puzzle_data': {
+            'puzzle': result['puzzle'].to_dict(),
+            'solution': result['solution'].to_dict(),
+            'removed_cells': result['removed_cells'],
+        },
+        'puzzle_id': f'puzzle-{seed}',
+        'difficulty': 'easy',
+        'seed': seed,
+    }
+    return {'puzzle_data': payload, 'difficulty': 'easy'}
+
+
+def as_json(data):
+    """응답으로 보낼 때와 같이 튜플을 리스트로 바꾼 문서"""
+    return json.loads(json.dumps(data))
+
+
+class FlakyStore(InMemoryPuzzleStore):
+    """처음 failures번의 write_batch를 실패시키는 저장소"""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def write_batch(self, items):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("write failed")
+        super().write_batch(items)
+
+
+def test_cache_remembers_missing_puzzles_until_written():
+    cache = CachedPuzzleStore(InMemoryPuzzleStore())
+    assert cache.get_entry('puzzle-1') == (None, None)
+    assert cache.get_entry('puzzle-1') == (None, None)
+    assert cache.snapshot()['negative_hits'] == 1
+
+    doc = puzzle_document(1)
+    cache.write_batch([('puzzle-1', doc)])
+    data, etag = cache.get_entry('puzzle-1')
+    assert as_json(data) == as_json(doc) and etag
+    assert cache.get_entry('puzzle-1') == (data, etag)
+    assert cache.snapshot()['hits'] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    store = InMemoryPuzzleStore()
+    store.write_batch([(f'puzzle-{seed}', puzzle_document(seed)) for seed in (1, 2, 3)])
+    cache = CachedPuzzleStore(store, max_size=2)
+    cache.get('puzzle-1')
+    cache.get('puzzle-2')
+    cache.get('puzzle-1')
+    cache.get('puzzle-3')
+    assert list(cache.entries) == ['puzzle-1', 'puzzle-3']
+    assert cache.snapshot()['evictions'] == 1
+
+
+def test_write_queue_retries_failed_batches():
+    store = FlakyStore(failures=2)
+    write_queue = WriteBehindQueue(store, flush_interval=0.01, retry_backoff=0)
+    write_queue.put(puzzle_document(1), 'puzzle-1')
+    assert write_queue.get('puzzle-1') is not None
+    write_queue.flush()
+
+    stats = write_queue.snapshot()
+    assert (stats['written'], stats['retries'], stats['failed']) == (1, 2, 0)
+    assert write_queue.get('puzzle-1') is None
+    assert as_json(store.get('puzzle-1')) == as_json(puzzle_document(1))
+    write_queue.close()
+
+
+def test_write_queue_drops_batch_after_max_retries():
+    store = FlakyStore(failures=10)
+    write_queue = WriteBehindQueue(store, flush_interval=0.01, max_retries=1, retry_backoff=0)
+    write_queue.put(puzzle_document(1), 'puzzle-1')
+    write_queue.flush()
+
+    stats = write_queue.snapshot()
+    assert (stats['written'], stats['retries'], stats['failed']) == (0, 1, 1)
+    assert write_queue.get('puzzle-1') is None
+    assert store.get('puzzle-1') is None
+    write_queue.close()
+
+
+@pytest.fixture
+def server():
+    pytest.importorskip('flask')
+    import chessudoku_api_server
+
+    chessudoku_api_server.create_app(InMemoryPuzzleStore())
+    yield chessudoku_api_server
+    chessudoku_api_server.close_storage()
+
+
+@pytest.fixture
+def client(server):
+    return server.create_app(InMemoryPuzzleStore()).test_client()
+
+
+def test_etag_is_stable_across_flush(server):
+    # 저장을 늦춰 첫 조회가 쓰기 대기열에서 응답되도록 함
+    client = server.create_app(InMemoryPuzzleStore(write_delay=0.2)).test_client()
+    server.write_queue.put(puzzle_document(1), 'puzzle-1')
+    pending = client.get('/puzzles/puzzle-1')
+    assert pending.status_code == 200
+    assert pending.headers['Cache-Control'] == 'no-cache'
+
+    server.write_queue.flush()
+    stored = client.get('/puzzles/puzzle-1')
+    assert stored.status_code == 200
+    assert stored.headers['ETag'] == pending.headers['ETag']
+    assert stored.get_json() == pending.get_json()
+    assert 'immutable' in stored.headers['Cache-Control']
+
+
+def test_if_none_match_gives_304(server, client):
+    server.write_queue.put(puzzle_document(1), 'puzzle-1')
+    server.write_queue.flush()
+    etag = client.get('/puzzles/puzzle-1').headers['ETag']
+    response = client.get('/puzzles/puzzle-1', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert not response.data
+
+
+def test_repeated_404_is_a_negative_hit(client):
+    assert client.get('/puzzles/missing').status_code == 404
+    assert client.get('/puzzles/missing').status_code == 404
+    stats = client.get('/cache/stats').get_json()
+    assert (stats['misses'], stats['negative_hits']) == (1, 1)
+
+
+def test_written_puzzle_clears_negative_entry(server, client):
+    assert client.get('/puzzles/puzzle-1').status_code == 404
+    server.write_queue.put(puzzle_document(1), 'puzzle-1')
+    server.write_queue.flush()
+    response = client.get('/puzzles/puzzle-1')
+    assert response.status_code == 200
+    assert response.get_json()['puzzle_data']['puzzle_id'] == 'puzzle-1'
@@ -0,0 +1,138 @@
+import random
+
+import pytest
+
+from benchmark import PIECE_CATALOGUE
+from chessudoku import count_solutions, generate_puzzle, is_unique
+
+LAYOUTS = sorted(PIECE_CATALOGUE)
+SEEDS = [1, 2, 3]
+
+
+def knight_cells(row, col):
+    moves = [(row - 2, col - 1), (row - 2, col + 1), (row - 1, col - 2), (row - 1, col + 2),
+             (row + 1, col - 2), (row + 1, col + 2), (row + 2, col - 1), (row + 2, col + 1)]
+    return [(r, c) for r, c in moves if 0 <= r < 9 and 0 <= c < 9]
+
+
+def king_cells(row, col):
+    return [(r, c) for r in range(row - 1, row + 2) for c in range(col - 1, col + 2)
+            if (r, c) != (row, col) and 0 <= r < 9 and 0 <= c < 9]
+
+
+def bishop_cells(row, col, pieces, steps):
+    """한 대각선의 두 방향으로 기물을 만나기 전까지의 칸"""
+    cells = []
+    for dr, dc in steps:
+        r, c = row + dr, col + dc
+        while 0 <= r < 9 and 0 <= c < 9 and (r, c) not in pieces:
+            cells.append((r, c))
+            r, c = r + dr, c + dc
+    return cells
+
+
+def baseline_regions(piece_config):
+    """기존 is_valid_number 규칙의 영역 목록 (행, 열, 박스, 나이트, 비숍 대각선별, 킹)"""
+    pieces = {(row, col) for _, row, col in piece_config}
+    regions = [[(i, j) for j in range(9)] for i in range(9)]
+    regions += [[(i, j) for i in range(9)] for j in range(9)]
+    regions += [[(top + i, left + j) for i in range(3) for j in range(3)]
+                for top in (0, 3, 6) for left in (0, 3, 6)]
+    for piece, row, col in piece_config:
+        if piece == 'knight':
+            regions.append(knight_cells(row, col))
+        elif piece == 'king':
+            regions.append(king_cells(row, col))
+        elif piece == 'bishop':
+            regions.append(bishop_cells(row, col, pieces, [(-1, -1), (1, 1)]))
+            regions.append(bishop_cells(row, col, pieces, [(-1, 1), (1, -1)]))
+    return [[cell for cell in region if cell not in pieces] for region in regions]
+
+
+def digits(board):
+    return {(i, j): board.board[i][j] for i in range(9) for j in range(9)
+            if isinstance(board.board[i][j], int)}
+
+
+def generate_all(difficulty):
+    """(배치 이름, seed)별 generate_puzzle 결과"""
+    return {
+        (name, seed): generate_puzzle(difficulty=difficulty, piece_config=PIECE_CATALOGUE[name],
+                                      seed=seed)
+        for name in LAYOUTS for seed in SEEDS
+    }
+
+
+@pytest.fixture(scope='module')
+def generated():
+    return generate_all('hard')
+
+
+@pytest.fixture(scope='module')
+def generated_medium():
+    # 몇 칸만 더 지워도 해가 여러 개가 되도록 힌트가 많은 퍼즐 사용
+    return generate_all('medium')
+
+
+def loosened(result, extra, seed):
+    """퍼즐에서 숫자를 extra개 더 지워 해가 여러 개일 수 있는 보드 생성"""
+    puzzle = result['puzzle'].clone()
+    filled = sorted(digits(puzzle))
+    for row, col in random.Random(seed).sample(filled, extra):
+        puzzle.remove_number(row, col)
+    return puzzle
+
+
+@pytest.mark.parametrize('name', LAYOUTS)
+@pytest.mark.parametrize('seed', SEEDS)
+def test_solution_follows_baseline_rules(generated, name, seed):
+    solution = digits(generated[name, seed]['solution'])
+    pieces = {(row, col) for _, row, col in PIECE_CATALOGUE[name]}
+    assert set(solution) == {(i, j) for i in range(9) for j in range(9)} - pieces
+    assert all(1 <= num <= 9 for num in solution.values())
+    for region in baseline_regions(PIECE_CATALOGUE[name]):
+        numbers = [solution[cell] for cell in region]
+        assert len(numbers) == len(set(numbers)), region
+
+
+@pytest.mark.parametrize('name', LAYOUTS)
+@pytest.mark.parametrize('seed', SEEDS)
+def test_puzzle_matches_solution(generated, name, seed):
+    result = generated[name, seed]
+    puzzle = digits(result['puzzle'])
+    solution = digits(result['solution'])
+    assert all(solution[cell] == num for cell, num in puzzle.items())
+    for row, col, num in result['removed_cells']:
+        assert (row, col) not in puzzle and solution[row, col] == num
+
+
+@pytest.mark.parametrize('name', LAYOUTS)
+@pytest.mark.parametrize('seed', SEEDS)
+def test_generated_puzzle_is_unique(generated, name, seed):
+    result = generated[name, seed]
+    assert is_unique(result['puzzle'], result['solution'])
+    assert count_solutions(result['puzzle'], max_count=2) == 1
+
+
+@pytest.mark.parametrize('name', LAYOUTS)
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('extra', [2, 4, 6])
+def test_backends_agree_on_counts(generated_medium, name, seed, extra):
+    result = generated_medium[name, seed]
+    puzzle = loosened(result, extra, seed=extra)
+    counts = {
+        'bitmask': count_solutions(puzzle, max_count=3),
+        'bitmask_no_propagate': count_solutions(puzzle, max_count=3, propagate=False),
+        'bitmask_no_fail_fast': count_solutions(puzzle, max_count=3, fail_fast=False),
+        'dlx': count_solutions(puzzle, max_count=3, backend='dlx'),
+    }
+    assert len(set(counts.values())) == 1, counts
+    assert counts['bitmask'] >= 1
+    assert is_unique(puzzle, result['solution']) == (counts['bitmask'] == 1)
+
+
+def test_same_seed_gives_same_puzzle():
+    first = generate_puzzle(difficulty='medium', seed=7)
+    second = generate_puzzle(difficulty='medium', seed=7)
+    assert first['puzzle'].to_compact() == second['puzzle'].to_compact()
+    assert first['removed_cells'] == second['removed_cells']